@@ -0,0 +1,104 @@
+"""
+Response compression negotiated from Accept-Encoding: brotli when the client and
+server support it, gzip otherwise
+
+Only complete (non-streaming) responses of compressible types above a minimum
+size are compressed; streaming responses pass through untouched.
+"""
+from typing import Dict, Optional
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "application/problem+json", "text/")
+
+def accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into encoding -> q value"""
+    encodings = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            encodings[name.lower()] = q
+    return encodings
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip, preferring the higher q value and brotli on ties"""
+    encodings = accepted_encodings(accept_encoding)
+    wildcard = encodings.get("*", 0.0)
+    candidates = {"gzip": encodings.get("gzip", wildcard)}
+    if brotli is not None:
+        candidates["br"] = encodings.get("br", wildcard)
+    encoding, q = max(candidates.items(), key=lambda item: (item[1], item[0] == "br"))
+    return encoding if q > 0 else None
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", "")) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        streaming = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, streaming
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or streaming:
+                await send(message)
+                return
+
+            if message.get("more_body", False):
+                # Streaming response: send it as is
+                streaming = True
+                await send(start)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            content_type = headers.get("content-type", "")
+            if (
+                len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            body = self.compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,16 +1,225 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from contextvars import ContextVar
+from functools import lru_cache
+from threading import Lock
+from typing import Any, AsyncIterator, Dict, List, Optional
 import os
+import time
 from dotenv import load_dotenv
+from backend.utils.query_stats import track_statements
 
 load_dotenv()
 
 # Construct the DB url
 DATABASE_URL = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
+ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+class PoolMetrics:
+    """Connection pool counters, updated from pool events"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.checkout_timeouts = 0
+        self.checkout_errors = 0
+        self.waits = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.total_connect_seconds = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.waits += 1
+            self.total_wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            if timed_out:
+                self.checkout_timeouts += 1
+
+    def record_connect(self, seconds: float) -> None:
+        with self._lock:
+            self.total_connect_seconds += seconds
+
+    def increment(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "checkout_timeouts": self.checkout_timeouts,
+                "checkout_errors": self.checkout_errors,
+                "total_wait_seconds": self.total_wait_seconds,
+                "max_wait_seconds": self.max_wait_seconds,
+                "avg_wait_seconds": self.total_wait_seconds / self.waits if self.waits else 0.0,
+                "total_connect_seconds": self.total_connect_seconds,
+            }
+
+# Counters of the sync engine's pool and of the async engine's pool
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+# Seconds spent opening new connections during the current checkout, None outside _do_get
+_checkout_connects: ContextVar[Optional[List[float]]] = ContextVar("checkout_connects", default=None)
+
+class _TimedCheckout:
+    """
+    Pool mixin that records how long each checkout waited for a connection in ``metrics``
+
+    Opening a new (overflow) connection is timed separately as connect time and
+    left out of the wait, so the wait only measures contention for the pool.
+    """
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        if _checkout_connects.get() is not None:
+            # QueuePool retries by calling _do_get again; time the outer call only
+            return super()._do_get()
+        connects: List[float] = []
+        token = _checkout_connects.set(connects)
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        except Exception:
+            # Connection failures are not waits for the pool, only count them
+            self.metrics.increment("checkout_errors")
+            raise
+        finally:
+            _checkout_connects.reset(token)
+        self.metrics.record_wait(time.perf_counter() - started - sum(connects))
+        return connection
+
+    def _create_connection(self):
+        started = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            seconds = time.perf_counter() - started
+            self.metrics.record_connect(seconds)
+            connects = _checkout_connects.get()
+            if connects is not None:
+                connects.append(seconds)
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    metrics = pool_metrics
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    metrics = async_pool_metrics
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes")
+
+# Serve the API through the async engine and sessions (DB_ASYNC=true)
+ASYNC_DB = _env_bool("DB_ASYNC", False)
+
+def _pool_options() -> Dict[str, Any]:
+    return {
+        "pool_size": _env_int("DB_POOL_SIZE", 5),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+
+def _track_pool_events(sync_engine, metrics: PoolMetrics) -> None:
+    event.listen(sync_engine, "connect", lambda *args: metrics.increment("connects"))
+    event.listen(sync_engine, "checkout", lambda *args: metrics.increment("checkouts"))
+    event.listen(sync_engine, "checkin", lambda *args: metrics.increment("checkins"))
+    event.listen(sync_engine, "invalidate", lambda *args: metrics.increment("invalidations"))
+
+def get_engine(database_url: str = DATABASE_URL):
+    """
+    Return the SQLAlchemy engine shared by every backend module (one per database url)
+
+    Pool settings are read from the environment:
+        DB_POOL_SIZE (default 5), DB_MAX_OVERFLOW (default 10),
+        DB_POOL_TIMEOUT seconds (default 30), DB_POOL_RECYCLE seconds (default 1800),
+        DB_POOL_PRE_PING (default true), DB_STATEMENT_TIMEOUT_MS (default 0, no timeout)
+    """
+    # Normalized here so get_engine() and get_engine(DATABASE_URL) share one engine
+    return _create_engine(database_url)
+
+@lru_cache(maxsize=None)
+def _create_engine(database_url: str):
+    connect_args = {}
+    statement_timeout = _env_int("DB_STATEMENT_TIMEOUT_MS", 0)
+    if statement_timeout:
+        connect_args["options"] = f"-c statement_timeout={statement_timeout}"
+
+    shared_engine = create_engine(
+        database_url,
+        poolclass=TimedQueuePool,
+        connect_args=connect_args,
+        **_pool_options(),
+    )
+    _track_pool_events(shared_engine, pool_metrics)
+    track_statements(shared_engine)
+    return shared_engine
+
+@lru_cache(maxsize=None)
+def get_async_engine():
+    """
+    Create the asyncpg-backed engine used by the API in async mode
+
+    Uses the same DB_* pool settings as get_engine.
+    """
+    connect_args = {}
+    statement_timeout = _env_int("DB_STATEMENT_TIMEOUT_MS", 0)
+    if statement_timeout:
+        connect_args["server_settings"] = {"statement_timeout": str(statement_timeout)}
+
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        poolclass=TimedAsyncQueuePool,
+        connect_args=connect_args,
+        **_pool_options(),
+    )
+    _track_pool_events(async_engine.sync_engine, async_pool_metrics)
+    track_statements(async_engine.sync_engine)
+    return async_engine
+
+@lru_cache(maxsize=None)
+def get_async_sessionmaker():
+    """Create the AsyncSession factory bound to the async engine"""
+    return async_sessionmaker(get_async_engine(), expire_on_commit=False, autoflush=False)
+
+def get_pool_metrics(async_engine: bool = ASYNC_DB) -> Dict[str, Any]:
+    """
+    Return pool checkout/wait counters together with the current pool occupancy
+
+    Defaults to the pool serving the API: the async engine's with DB_ASYNC, the sync engine's otherwise.
+    """
+    if async_engine:
+        pool, metrics = get_async_engine().pool, async_pool_metrics
+    else:
+        pool, metrics = get_engine().pool, pool_metrics
+    return {
+        **metrics.snapshot(),
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "idle": pool.checkedin(),
+    }
 
 # Create SQLAlchemy engine
-engine = create_engine(DATABASE_URL)
+engine = get_engine()
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -24,4 +233,10 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency to get an async DB session
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with get_async_sessionmaker()() as db:
+        yield db
+
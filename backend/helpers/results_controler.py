@@ -15,4 +15,22 @@ display_columns = [
                     "city",
                     "state",
                     "date_of_birth",
-]
\ No newline at end of file
+]
+
+# Duration columns of athletes_results, in race order
+RESULT_TIME_COLUMNS = [
+    "race_swim_10km_time",
+    "race_bike_145km_time",
+    "race_bike_276km_time",
+    "race_run_84km_time",
+    "race_overall_time",
+]
+
+# Rank columns of athletes_results, in race order
+RESULT_RANK_COLUMNS = [
+    "race_swim_10km_rank",
+    "race_bike_145km_rank",
+    "race_bike_276km_rank",
+    "race_run_84km_rank",
+    "race_overall_rank",
+]
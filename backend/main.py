@@ -1,10 +1,29 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Index, func, insert, select, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from threading import Lock
+import hashlib
+import json
+import os
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 from . import database
+from .compression import CompressionMiddleware
+from .pagination import decode_cursor, set_next_cursor
+from .utils.query_stats import query_stats
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard encoder is used without it
+    orjson = None
 
 app = FastAPI(title="FastAPI Supabase Demo")
 
@@ -15,8 +34,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
 )
 
+# Compress large responses with brotli or gzip, as the client accepts
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1000)))
+
 # Pydantic models for request/response
 class ItemBase(BaseModel):
     title: str
@@ -32,6 +55,14 @@ class Item(ItemBase):
     class Config:
         orm_mode = True
 
+class ItemBatchError(BaseModel):
+    index: int
+    error: str
+
+class ItemBatchResult(BaseModel):
+    created: List[Item]
+    errors: List[ItemBatchError]
+
 # Database model
 from sqlalchemy import Column, Integer, String, DateTime
 from .database import Base
@@ -44,30 +75,382 @@ class ItemModel(Base):
     description = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-# Create tables
+    __table_args__ = (
+        # Keyset pagination order for /items/
+        Index("ix_items_created_at_id", "created_at", "id"),
+    )
+
+# Create tables (and the pagination index on an already existing items table)
 database.Base.metadata.create_all(bind=database.engine)
+for index in ItemModel.__table__.indexes:
+    index.create(bind=database.engine, checkfirst=True)
+
+# Bulk item ingestion: JSON array or NDJSON bodies, inserted in multi-row batches
+ITEM_BATCH_SIZE = 500
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+def validate_batch_item(index: int, payload: Any) -> Union[Dict[str, Any], ItemBatchError]:
+    try:
+        if isinstance(payload, bytes):
+            payload = json.loads(payload)
+        return ItemCreate.parse_obj(payload).dict()
+    except ValueError as e:
+        return ItemBatchError(index=index, error=str(e))
+
+async def iter_batch_payloads(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in NDJSON_CONTENT_TYPES:
+        # Stream NDJSON line by line instead of buffering the whole body
+        index = 0
+        pending = b""
+        async for chunk in request.stream():
+            *lines, pending = (pending + chunk).split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield index, line
+                    index += 1
+        if pending.strip():
+            yield index, pending
+        return
+
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    for index, item in enumerate(payload):
+        yield index, item
+
+async def iter_item_batches(request: Request, batch_size: int):
+    """Yield (rows, errors) per batch, rows being (index, values) pairs that passed validation"""
+    rows, errors = [], []
+    async for index, payload in iter_batch_payloads(request):
+        values = validate_batch_item(index, payload)
+        if isinstance(values, ItemBatchError):
+            errors.append(values)
+        else:
+            rows.append((index, values))
+        if len(rows) + len(errors) >= batch_size:
+            yield rows, errors
+            rows, errors = [], []
+    if rows or errors:
+        yield rows, errors
+
+items_insert = insert(ItemModel.__table__).returning(*ItemModel.__table__.c)
+
+def insert_item_batch(db: Session, rows: List[Tuple[int, Dict[str, Any]]]):
+    """Insert a batch with one multi-row INSERT ... RETURNING, isolating failing rows on error"""
+    try:
+        created = db.execute(items_insert, [values for _, values in rows]).mappings().all()
+        db.commit()
+        return list(created), []
+    except (SQLAlchemyError, ValueError):
+        db.rollback()
+
+    created, errors = [], []
+    for index, values in rows:
+        try:
+            created.extend(db.execute(items_insert, [values]).mappings().all())
+            db.commit()
+        except (SQLAlchemyError, ValueError) as e:
+            db.rollback()
+            errors.append(ItemBatchError(index=index, error=str(getattr(e, "orig", e))))
+    return created, errors
+
+async def insert_item_batch_async(db: AsyncSession, rows: List[Tuple[int, Dict[str, Any]]]):
+    """Async counterpart of insert_item_batch"""
+    try:
+        result = await db.execute(items_insert, [values for _, values in rows])
+        created = result.mappings().all()
+        await db.commit()
+        return list(created), []
+    except (SQLAlchemyError, ValueError):
+        await db.rollback()
+
+    created, errors = [], []
+    for index, values in rows:
+        try:
+            result = await db.execute(items_insert, [values])
+            created.extend(result.mappings().all())
+            await db.commit()
+        except (SQLAlchemyError, ValueError) as e:
+            await db.rollback()
+            errors.append(ItemBatchError(index=index, error=str(getattr(e, "orig", e))))
+    return created, errors
+
+# Queries shared by the sync and async endpoints
+def items_page_query(skip: int, limit: int):
+    return select(ItemModel).order_by(ItemModel.created_at, ItemModel.id).offset(skip).limit(limit)
+
+def items_keyset_query(after: Optional[Tuple[datetime, int]], limit: int):
+    query = select(ItemModel).order_by(ItemModel.created_at, ItemModel.id).limit(limit)
+    if after is not None:
+        query = query.where(tuple_(ItemModel.created_at, ItemModel.id) > tuple_(*after))
+    return query
+
+def item_query(item_id: int):
+    return select(ItemModel).where(ItemModel.id == item_id)
+
+def items_version_query():
+    """Newest id and created_at of the items table; both change whenever an item is created"""
+    return select(func.max(ItemModel.id), func.max(ItemModel.created_at))
+
+# Conditional GET: weak ETags and Last-Modified derived from item ids and created_at
+def make_etag(*parts: Any) -> str:
+    return 'W/"' + hashlib.sha1(repr(parts).encode()).hexdigest()[:24] + '"'
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no ETag was sent"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or etag[2:] in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+            if since.tzinfo is None:
+                # "-0000" zones parse as naive datetimes; HTTP dates are always UTC
+                since = since.replace(tzinfo=timezone.utc)
+            return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def not_modified_response(etag: str, last_modified: Optional[datetime]) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
+class ResponseCache:
+    """
+    In-process LRU cache of serialized list responses, keyed by ETag
+
+    ETags include the items version, so an entry can never be served for changed
+    data, even by other workers; clearing on create only frees the stale entries.
+    """
+
+    def __init__(self, max_entries: int):
+        self._lock = Lock()
+        self._entries: "OrderedDict[str, Tuple[bytes, Dict[str, str]]]" = OrderedDict()
+        self.max_entries = max_entries
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, body: bytes, headers: Dict[str, str]) -> None:
+        with self._lock:
+            self._entries[key] = (body, headers)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+# Cache serialized /items/ pages in memory (ITEMS_RESPONSE_CACHE=true)
+items_response_cache = (
+    ResponseCache(int(os.getenv("ITEMS_RESPONSE_CACHE_SIZE", 256)))
+    if os.getenv("ITEMS_RESPONSE_CACHE", "false").lower() in ("1", "true", "yes")
+    else None
+)
+
+# Serialize /items/ pages straight from column rows with orjson, skipping per-row
+# model validation (ITEMS_FAST_JSON, on by default when orjson is installed)
+ITEMS_FAST_JSON = orjson is not None and os.getenv("ITEMS_FAST_JSON", "true").lower() in ("1", "true", "yes")
+item_columns = list(ItemModel.__table__.c)
+
+def serialize_items(items: List[Any]) -> bytes:
+    """Serialize ORM items or column rows to the same JSON as List[Item]"""
+    if ITEMS_FAST_JSON:
+        return orjson.dumps([dict(item._mapping) for item in items])
+    return json.dumps(jsonable_encoder([Item.from_orm(item) for item in items]), separators=(",", ":")).encode()
+
+def items_response(items: List[Any], response: Response) -> Response:
+    """Serialize a page of items once, storing it in the response cache (when enabled) under its ETag"""
+    body = serialize_items(items)
+    headers = {
+        name: value for name, value in response.headers.items()
+        if name not in ("content-length", "content-type")
+    }
+    if items_response_cache is not None:
+        items_response_cache.set(headers["etag"], body, headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def invalidate_items_cache() -> None:
+    if items_response_cache is not None:
+        items_response_cache.clear()
+
+# Request handling shared by the sync and async endpoints, which only run the queries
+def items_list_query(skip: int, limit: int, cursor: Optional[str]):
+    """Query for a page of items: column rows with ITEMS_FAST_JSON, ORM items otherwise"""
+    if cursor is None:
+        query = items_page_query(skip, limit)
+    else:
+        query = items_keyset_query(decode_cursor(cursor), limit)
+    return query.with_only_columns(*item_columns) if ITEMS_FAST_JSON else query
+
+def items_from_result(result) -> List[Any]:
+    """Rows of an items_list_query result"""
+    return result.all() if ITEMS_FAST_JSON else result.scalars().all()
+
+def items_list_validators(request: Request,
+                          version: Tuple[Optional[int], Optional[datetime]],
+                          skip: int,
+                          limit: int,
+                          cursor: Optional[str]) -> Tuple[str, Optional[datetime], Optional[Response]]:
+    """
+    ETag and Last-Modified of a list page, from the items_version_query row
+
+    The response is set when the page does not have to be queried: a 304 for a
+    matching conditional request, or the serialized page from the response cache.
+    """
+    max_id, last_modified = version
+    etag = make_etag("items", max_id, last_modified, skip, limit, cursor)
+    if is_not_modified(request, etag, last_modified):
+        return etag, last_modified, not_modified_response(etag, last_modified)
+    if items_response_cache is not None and (cached := items_response_cache.get(etag)) is not None:
+        return etag, last_modified, Response(content=cached[0], media_type="application/json", headers=cached[1])
+    return etag, last_modified, None
+
+def items_list_response(response: Response,
+                        items: List[Any],
+                        limit: int,
+                        cursor: Optional[str],
+                        etag: str,
+                        last_modified: Optional[datetime]):
+    """Set the cursor and validator headers and serialize the page"""
+    if cursor is not None:
+        set_next_cursor(response, items, limit)
+    response.headers.update(validator_headers(etag, last_modified))
+    if ITEMS_FAST_JSON or items_response_cache is not None:
+        return items_response(items, response)
+    return items
+
+def item_detail_response(request: Request, response: Response, item: Optional[ItemModel]):
+    """404 for a missing item, 304 when the client's copy is current, the item otherwise"""
+    if item is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    etag = make_etag("item", item.id, item.created_at, item.title, item.description)
+    if is_not_modified(request, etag, item.created_at):
+        return not_modified_response(etag, item.created_at)
+    response.headers.update(validator_headers(etag, item.created_at))
+    return item
+
+def item_batch_result(created: List[Any], errors: List[ItemBatchError]) -> Dict[str, Any]:
+    invalidate_items_cache()
+    return {"created": created, "errors": sorted(errors, key=lambda error: error.index)}
 
 # API endpoints
 @app.get("/")
 def read_root():
     return {"message": "Welcome to FastAPI with Supabase!"}
 
-@app.get("/items/", response_model=List[Item])
-def read_items(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
-    items = db.query(ItemModel).offset(skip).limit(limit).all()
-    return items
+@app.get("/metrics")
+def read_metrics():
+    """Connection pool counters, statement timings and DatabaseController query timings of this process"""
+    return {"pool": database.get_pool_metrics(), **query_stats.snapshot()}
 
-@app.post("/items/", response_model=Item)
-def create_item(item: ItemCreate, db: Session = Depends(database.get_db)):
-    db_item = ItemModel(**item.dict())
-    db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
-    return db_item
-
-@app.get("/items/{item_id}", response_model=Item)
-def read_item(item_id: int, db: Session = Depends(database.get_db)):
-    item = db.query(ItemModel).filter(ItemModel.id == item_id).first()
-    if item is None:
-        raise HTTPException(status_code=404, detail="Item not found")
-    return item
\ No newline at end of file
+if database.ASYNC_DB:
+    @app.get("/items/", response_model=List[Item])
+    async def read_items(request: Request,
+                         response: Response,
+                         skip: int = 0,
+                         limit: int = Query(100, ge=1),
+                         cursor: Optional[str] = None,
+                         db: AsyncSession = Depends(database.get_async_db)):
+        query = items_list_query(skip, limit, cursor)
+        version = (await db.execute(items_version_query())).one()
+        etag, last_modified, early = items_list_validators(request, version, skip, limit, cursor)
+        if early is not None:
+            return early
+        items = items_from_result(await db.execute(query))
+        return items_list_response(response, items, limit, cursor, etag, last_modified)
+
+    @app.post("/items/", response_model=Item)
+    async def create_item(item: ItemCreate, db: AsyncSession = Depends(database.get_async_db)):
+        db_item = ItemModel(**item.dict())
+        db.add(db_item)
+        await db.commit()
+        await db.refresh(db_item)
+        invalidate_items_cache()
+        return db_item
+
+    @app.post("/items/batch", response_model=ItemBatchResult)
+    async def create_items_batch(request: Request,
+                                 batch_size: int = Query(ITEM_BATCH_SIZE, ge=1),
+                                 db: AsyncSession = Depends(database.get_async_db)):
+        created, errors = [], []
+        async for rows, invalid in iter_item_batches(request, batch_size):
+            errors.extend(invalid)
+            if rows:
+                batch_created, batch_errors = await insert_item_batch_async(db, rows)
+                created.extend(batch_created)
+                errors.extend(batch_errors)
+        return item_batch_result(created, errors)
+
+    @app.get("/items/{item_id}", response_model=Item)
+    async def read_item(item_id: int,
+                        request: Request,
+                        response: Response,
+                        db: AsyncSession = Depends(database.get_async_db)):
+        item = (await db.execute(item_query(item_id))).scalars().first()
+        return item_detail_response(request, response, item)
+
+else:
+    @app.get("/items/", response_model=List[Item])
+    def read_items(request: Request,
+                   response: Response,
+                   skip: int = 0,
+                   limit: int = Query(100, ge=1),
+                   cursor: Optional[str] = None,
+                   db: Session = Depends(database.get_db)):
+        query = items_list_query(skip, limit, cursor)
+        version = db.execute(items_version_query()).one()
+        etag, last_modified, early = items_list_validators(request, version, skip, limit, cursor)
+        if early is not None:
+            return early
+        items = items_from_result(db.execute(query))
+        return items_list_response(response, items, limit, cursor, etag, last_modified)
+
+    @app.post("/items/", response_model=Item)
+    def create_item(item: ItemCreate, db: Session = Depends(database.get_db)):
+        db_item = ItemModel(**item.dict())
+        db.add(db_item)
+        db.commit()
+        db.refresh(db_item)
+        invalidate_items_cache()
+        return db_item
+
+    @app.post("/items/batch", response_model=ItemBatchResult)
+    async def create_items_batch(request: Request,
+                                 batch_size: int = Query(ITEM_BATCH_SIZE, ge=1),
+                                 db: Session = Depends(database.get_db)):
+        created, errors = [], []
+        async for rows, invalid in iter_item_batches(request, batch_size):
+            errors.extend(invalid)
+            if rows:
+                # Blocking session work runs in the threadpool, off the event loop
+                batch_created, batch_errors = await run_in_threadpool(insert_item_batch, db, rows)
+                created.extend(batch_created)
+                errors.extend(batch_errors)
+        return item_batch_result(created, errors)
+
+    @app.get("/items/{item_id}", response_model=Item)
+    def read_item(item_id: int,
+                  request: Request,
+                  response: Response,
+                  db: Session = Depends(database.get_db)):
+        item = db.execute(item_query(item_id)).scalars().first()
+        return item_detail_response(request, response, item)
@@ -0,0 +1,31 @@
+"""
+Opaque cursors for keyset pagination of /items/ over (created_at, id)
+
+A cursor is the URL-safe base64 of ``[created_at, id]`` of the last item of a page.
+"""
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+import base64
+import json
+
+from fastapi import HTTPException, Response
+
+def encode_cursor(item: Any) -> str:
+    """Cursor pointing after ``item`` (anything with created_at and id)"""
+    payload = json.dumps([item.created_at.isoformat(), item.id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """(created_at, id) of a cursor, None for an empty one (first page); 400 when malformed"""
+    if not cursor:
+        return None
+    try:
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def set_next_cursor(response: Response, items: List[Any], limit: int) -> None:
+    """Send the cursor of the next page in X-Next-Cursor when the page is full"""
+    if items and len(items) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(items[-1])
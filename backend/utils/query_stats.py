@@ -0,0 +1,176 @@
+"""
+Query timing, grouped by normalized query fingerprint
+
+Two views are kept:
+- queries: DatabaseController calls, split into execute (until the driver
+  returns), fetch (rows pulled from the cursor) and format (Python conversion
+  into dicts/DataFrames) phases, with their row counts
+- statements: every statement run on the shared engines, including the API's
+  ORM queries, timed around the driver's cursor execute from engine events
+
+Queries and statements slower than SLOW_QUERY_MS are logged and kept in a short
+list of recent slow queries; a statement run by a timed DatabaseController query
+is only reported once, as that query. The Streamlit sidebar and the API /metrics
+endpoint read snapshot().
+"""
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Dict, Iterator, List
+import logging
+import os
+import re
+import time
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Queries whose total time exceeds this many milliseconds are logged as slow
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 500))
+
+PHASES = ("execute", "fetch", "format")
+
+# Set while DatabaseController times a query, so its statements are not reported as slow twice
+_timing_query: ContextVar[bool] = ContextVar("timing_query", default=False)
+
+@lru_cache(maxsize=1024)
+def fingerprint(query: str) -> str:
+    """Normalize a query so calls differing only in literals or parameters group together"""
+    normalized = re.sub(r"'(?:[^']|'')*'", "?", query)
+    normalized = re.sub(r"%\(\w+\)s|\$\d+|(?<![:\w]):\w+", "?", normalized)
+    normalized = re.sub(r"\b\d+(?:\.\d+)?\b", "?", normalized)
+    normalized = re.sub(r"\(\s*\?(?:\s*,\s*\?)+\s*\)", "(?)", normalized)
+    return re.sub(r"\s+", " ", normalized).strip()
+
+class QueryStats:
+    """Query and statement counters per fingerprint, updated by DatabaseController and engine events"""
+
+    def __init__(self, slow_query_ms: float = SLOW_QUERY_MS, slow_query_history: int = 50):
+        self._lock = Lock()
+        self.slow_query_ms = slow_query_ms
+        self._queries: Dict[str, Dict[str, float]] = {}
+        self._statements: Dict[str, Dict[str, float]] = {}
+        self._slow_queries = deque(maxlen=slow_query_history)
+
+    def record(self, query: str, rows: int = 0, error: bool = False, **phases: float) -> None:
+        """
+        Record one DatabaseController query
+
+        Args:
+            query (str): SQL text (fingerprinted before grouping)
+            rows (int): Rows returned or affected
+            error (bool): Whether the query failed
+            **phases (float): Seconds spent per phase, keyed by PHASES
+        """
+        self._record(self._queries, "query", query, rows, error, True, phases)
+
+    def record_statement(self, statement: str, seconds: float, rows: int = 0, error: bool = False) -> None:
+        """
+        Record one statement executed on an engine, see track_statements
+
+        Args:
+            statement (str): SQL text as sent to the driver
+            seconds (float): Time spent in the driver's execute
+            rows (int): Rows reported by the cursor
+            error (bool): Whether the statement failed
+        """
+        self._record(self._statements, "statement", statement, rows, error, not _timing_query.get(),
+                     {"execute": seconds})
+
+    @contextmanager
+    def timing_query(self) -> Iterator[None]:
+        """Mark the statements run inside the block as part of a query recorded with record()"""
+        token = _timing_query.set(True)
+        try:
+            yield
+        finally:
+            _timing_query.reset(token)
+
+    def _record(self,
+                bucket: Dict[str, Dict[str, float]],
+                kind: str,
+                query: str,
+                rows: int,
+                error: bool,
+                report_slow: bool,
+                phases: Dict[str, float]) -> None:
+        key = fingerprint(query)
+        total = sum(phases.values())
+        slow = report_slow and total * 1000 >= self.slow_query_ms
+        with self._lock:
+            stats = bucket.get(key)
+            if stats is None:
+                stats = bucket[key] = {
+                    "calls": 0, "errors": 0, "rows": 0, "total_seconds": 0.0, "max_seconds": 0.0,
+                    **{f"{phase}_seconds": 0.0 for phase in PHASES},
+                }
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["rows"] += rows
+            stats["total_seconds"] += total
+            stats["max_seconds"] = max(stats["max_seconds"], total)
+            for phase, seconds in phases.items():
+                stats[f"{phase}_seconds"] += seconds
+
+            if slow:
+                self._slow_queries.append({
+                    "at": time.time(),
+                    "kind": kind,
+                    "fingerprint": key,
+                    "rows": rows,
+                    "total_seconds": total,
+                    **{f"{phase}_seconds": seconds for phase, seconds in phases.items()},
+                })
+        if slow:
+            timings = ", ".join(f"{phase} {seconds * 1000:.1f}ms" for phase, seconds in phases.items())
+            logger.warning("Slow %s (%.1fms: %s, %d rows): %s", kind, total * 1000, timings, rows, key)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-fingerprint query and statement totals, slowest total time first, and the recent slow queries"""
+        def summarize(bucket: Dict[str, Dict[str, float]]) -> List[Dict[str, Any]]:
+            rows = [
+                {"fingerprint": key, **stats, "avg_seconds": stats["total_seconds"] / stats["calls"]}
+                for key, stats in bucket.items()
+            ]
+            rows.sort(key=lambda stats: stats["total_seconds"], reverse=True)
+            return rows
+
+        with self._lock:
+            queries = summarize(self._queries)
+            statements = summarize(self._statements)
+            slow_queries = list(self._slow_queries)
+        return {
+            "slow_query_ms": self.slow_query_ms,
+            "queries": queries,
+            "statements": statements,
+            "slow_queries": slow_queries,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._queries.clear()
+            self._statements.clear()
+            self._slow_queries.clear()
+
+query_stats = QueryStats()
+
+def track_statements(sync_engine, stats: QueryStats = query_stats) -> None:
+    """Time every statement executed on an engine (the sync_engine of an async engine) into ``stats``"""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        connection.info.setdefault("statement_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        started = connection.info["statement_started"].pop()
+        stats.record_statement(statement, time.perf_counter() - started, max(cursor.rowcount, 0))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        started = context.connection.info.get("statement_started") if context.connection is not None else None
+        if started and context.statement is not None:
+            stats.record_statement(context.statement, time.perf_counter() - started.pop(), error=True)
@@ -0,0 +1,234 @@
+"""
+Cross-process cache for dashboard data, invalidated by data version instead of TTL
+
+Entries are keyed on the loader, its arguments and the version of the tables it
+reads (see DatabaseController.get_data_version), so they stay valid until those
+tables change and every Streamlit process/replica sharing the backend reuses them.
+The default backend is a SQLite file; any object with get/set/acquire/release
+methods (e.g. Redis-backed) can be plugged in with set_cache_backend.
+
+Cached values are DataFrames, stored as Parquet so reading the cache never runs code.
+"""
+from functools import wraps
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import io
+import logging
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+from backend.utils.results_controller import db_controller
+
+logger = logging.getLogger(__name__)
+
+# Tables the dashboard data is read from
+RESULTS_TABLES = ["athletes_results", "athletes_race", "athletes_athlete"]
+
+class MemoryCacheBackend:
+    """Per-process cache backend, for tests or single-process deployments"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._values: Dict[str, Tuple[float, Any]] = {}
+        self._groups: Dict[str, str] = {}
+        self._leases: Dict[str, float] = {}
+
+    def get(self, key: str) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            entry = self._values.get(key)
+            return entry if entry is None else (entry[0], entry[1].copy())
+
+    def set(self, key: str, value: pd.DataFrame, group: str) -> None:
+        """Store an entry, replacing the older entries of its group (same loader and arguments)"""
+        with self._lock:
+            previous = self._groups.get(group)
+            if previous is not None and previous != key:
+                self._values.pop(previous, None)
+            self._groups[group] = key
+            self._values[key] = (time.time(), value.copy())
+
+    def acquire(self, key: str, lease_seconds: float) -> bool:
+        with self._lock:
+            now = time.time()
+            if self._leases.get(key, 0) > now:
+                return False
+            self._leases[key] = now + lease_seconds
+            return True
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._leases.pop(key, None)
+
+def _frame_to_bytes(frame: pd.DataFrame) -> bytes:
+    if not isinstance(frame, pd.DataFrame):
+        raise TypeError(f"Only DataFrames can be cached, got {type(frame).__name__}")
+    buffer = io.BytesIO()
+    frame.to_parquet(buffer)
+    return buffer.getvalue()
+
+def _frame_from_bytes(data: bytes) -> pd.DataFrame:
+    return pd.read_parquet(io.BytesIO(data))
+
+class SQLiteCacheBackend:
+    """Cache backend stored in a SQLite file shared by every process that can reach it"""
+
+    def __init__(self, path: str):
+        self.path = path
+        # Create the file readable by its owner only before SQLite opens it
+        os.close(os.open(path, os.O_CREAT | os.O_RDWR, 0o600))
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries "
+                "(key TEXT PRIMARY KEY, loader_key TEXT, stored_at REAL, value BLOB)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS cache_entries_loader_key ON cache_entries (loader_key)")
+            connection.execute("CREATE TABLE IF NOT EXISTS cache_leases (key TEXT PRIMARY KEY, expires_at REAL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def get(self, key: str) -> Optional[Tuple[float, Any]]:
+        with self._connect() as connection:
+            row = connection.execute("SELECT stored_at, value FROM cache_entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0], _frame_from_bytes(row[1])
+
+    def set(self, key: str, value: pd.DataFrame, group: str) -> None:
+        """Store an entry, deleting the older entries of its group (same loader and arguments)"""
+        data = _frame_to_bytes(value)
+        with self._connect() as connection:
+            connection.execute("DELETE FROM cache_entries WHERE loader_key = ? AND key != ?", (group, key))
+            connection.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, loader_key, stored_at, value) VALUES (?, ?, ?, ?)",
+                (key, group, time.time(), data),
+            )
+
+    def acquire(self, key: str, lease_seconds: float) -> bool:
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute("DELETE FROM cache_leases WHERE key = ? AND expires_at <= ?", (key, now))
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO cache_leases (key, expires_at) VALUES (?, ?)", (key, now + lease_seconds)
+            )
+            return cursor.rowcount == 1
+
+    def release(self, key: str) -> None:
+        with self._connect() as connection:
+            connection.execute("DELETE FROM cache_leases WHERE key = ?", (key,))
+
+_backend = None
+_backend_lock = Lock()
+
+def default_cache_path() -> str:
+    """
+    Cache file in a directory only the current user can access
+
+    ``$XDG_CACHE_HOME/ultraman`` (``~/.cache/ultraman``), created with mode 0700; a
+    directory that is not owned by this user or that others can write to is refused.
+    """
+    directory = os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "ultraman")
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.stat(directory)
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"Cache directory {directory} must be owned by this user and private (mode 0700)")
+    return os.path.join(directory, "results_cache.sqlite3")
+
+def get_cache_backend():
+    """Return the configured backend, a SQLite file at RESULTS_CACHE_PATH (default_cache_path by default)"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = SQLiteCacheBackend(os.getenv("RESULTS_CACHE_PATH") or default_cache_path())
+        return _backend
+
+def set_cache_backend(backend) -> None:
+    """Replace the cache backend (e.g. with a shared network cache)"""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+# Data versions are re-checked at most every VERSION_CHECK_SECONDS per process
+VERSION_CHECK_SECONDS = float(os.getenv("RESULTS_CACHE_VERSION_CHECK_SECONDS", 5))
+_versions: Dict[Tuple[str, ...], Tuple[float, str]] = {}
+_versions_lock = Lock()
+
+def get_data_version(tables: List[str]) -> str:
+    """Return the data version of the tables, re-querying it at most every VERSION_CHECK_SECONDS"""
+    key = tuple(tables)
+    now = time.monotonic()
+    with _versions_lock:
+        checked = _versions.get(key)
+    if checked is not None and now - checked[0] < VERSION_CHECK_SECONDS:
+        return checked[1]
+
+    version = db_controller.get_data_version(list(tables))
+    with _versions_lock:
+        _versions[key] = (now, version)
+    return version
+
+def cached(name: str,
+           tables: List[str] = RESULTS_TABLES,
+           max_age: Optional[float] = None,
+           lease_seconds: float = 60) -> Callable:
+    """
+    Cache a loader's result across processes until the tables it reads change
+
+    Only one process computes a missing entry; the others wait for it instead of
+    all querying the database at once. Storing an entry drops the entries of older
+    data versions for the same loader and arguments. Loaders must return a DataFrame.
+    The cache never fails a page: when the backend errors (unwritable or unsafe
+    directory, locked database, unreadable entry), it is logged and the loader runs.
+
+    Args:
+        name (str): Cache namespace for the loader
+        tables (List[str]): Tables whose data version keys the entry
+        max_age (Optional[float]): Also expire entries after this many seconds, for
+            results that depend on more than the data (e.g. ages depend on today's date)
+        lease_seconds (float): How long other processes wait for a computing process
+    """
+    def decorator(loader: Callable) -> Callable:
+        @wraps(loader)
+        def wrapper(*args, **kwargs):
+            group = f"{name}:{args!r}:{sorted(kwargs.items())!r}"
+            key = f"{group}:{get_data_version(tables)}"
+
+            def fresh(entry) -> bool:
+                return entry is not None and (max_age is None or time.time() - entry[0] < max_age)
+
+            leased = False
+            try:
+                backend = get_cache_backend()
+                deadline = time.monotonic() + lease_seconds
+                while True:
+                    entry = backend.get(key)
+                    if fresh(entry):
+                        return entry[1]
+                    leased = backend.acquire(key, lease_seconds)
+                    if leased or time.monotonic() >= deadline:
+                        break
+                    time.sleep(0.1)
+            except Exception as error:
+                logger.warning("Results cache unavailable for %s, loading without it: %r", name, error)
+            if not leased:
+                return loader(*args, **kwargs)
+
+            try:
+                value = loader(*args, **kwargs)
+                try:
+                    backend.set(key, value, group)
+                except Exception as error:
+                    logger.warning("Could not store %s in the results cache: %r", name, error)
+                return value
+            finally:
+                try:
+                    backend.release(key)
+                except Exception as error:
+                    logger.warning("Could not release the results cache lease for %s: %r", name, error)
+        return wrapper
+    return decorator
@@ -1,93 +1,997 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import MetaData, Table, UniqueConstraint, bindparam, func, select, text, tuple_
+from sqlalchemy.exc import NoSuchTableError
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql import Executable
+from contextlib import contextmanager
+from functools import lru_cache
+from threading import Lock
+import io
 import os
+import time
+import pandas as pd
 from dotenv import load_dotenv
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple, Union
 from datetime import datetime
+from backend.database import DATABASE_URL, get_engine
+from backend.helpers.results_controler import RESULT_TIME_COLUMNS
+from backend.utils import results_ranking, results_summary
+from backend.utils.query_stats import query_stats
 
 # Load environment variables
 load_dotenv()
 
+# Supported representations for interval/duration columns in query results
+INTERVAL_FORMATS = ("string", "seconds", "timedelta")
+FRAME_INTERVAL_FORMATS = ("seconds", "timedelta")
+
+# Columns exposed by the results/race/athlete join, mapped to their SQL source
+RACE_RESULTS_VIEW_COLUMNS = {
+    "id": "r.id",
+    "athlete_id": "r.athlete_id",
+    "race_id": "r.race_id",
+    "race_swim_10km_time": "r.race_swim_10km_time",
+    "race_swim_10km_rank": "r.race_swim_10km_rank",
+    "race_bike_145km_time": "r.race_bike_145km_time",
+    "race_bike_145km_rank": "r.race_bike_145km_rank",
+    "race_bike_276km_time": "r.race_bike_276km_time",
+    "race_bike_276km_rank": "r.race_bike_276km_rank",
+    "race_run_84km_time": "r.race_run_84km_time",
+    "race_run_84km_rank": "r.race_run_84km_rank",
+    "race_overall_time": "r.race_overall_time",
+    "race_overall_rank": "r.race_overall_rank",
+    "race_edition": "ra.race_edition",
+    "race_date": "ra.race_date",
+    "race_location": "ra.race_location",
+    "complete_name": "a.complete_name",
+    "first_name": "a.first_name",
+    "nickname": "a.nickname",
+    "gender": "a.gender",
+    "eternal_number": "a.eternal_number",
+    "city": "a.city",
+    "state": "a.state",
+    "country": "a.country",
+    "date_of_birth": "a.date_of_birth",
+}
+
+def _intervals_to_seconds(rows: List[Any], width: int) -> List[Any]:
+    """
+    Convert interval values to float seconds, touching only interval columns
+
+    Interval columns are detected from the first non-null value of each column,
+    so non-interval columns are passed through without any per-cell work.
+    """
+    interval_indexes = []
+    for idx in range(width):
+        for row in rows:
+            value = row[idx]
+            if value is not None:
+                if hasattr(value, 'total_seconds'):
+                    interval_indexes.append(idx)
+                break
+
+    if not interval_indexes:
+        return rows
+
+    converted = []
+    for row in rows:
+        row = list(row)
+        for idx in interval_indexes:
+            if row[idx] is not None:
+                row[idx] = row[idx].total_seconds()
+        converted.append(row)
+    return converted
+
+def format_interval(value: Any) -> str:
+    """Format an interval/timedelta as HH:MM:SS.mmm (hours may exceed 24)"""
+    total_seconds = value.total_seconds()
+    hours = int(total_seconds // 3600)
+    minutes = int((total_seconds % 3600) // 60)
+    seconds = total_seconds % 60
+    return f"{hours:02d}:{minutes:02d}:{seconds:06.3f}"
+
+def format_interval_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Copy of rows fetched with interval_format="timedelta", intervals formatted for display"""
+    return [
+        {column: format_interval(value) if hasattr(value, 'total_seconds') else value for column, value in row.items()}
+        for row in rows
+    ]
+
+def _limit_clause(limit: Optional[int]) -> str:
+    """Build the LIMIT clause for an optional row limit (no limit when None)"""
+    return "LIMIT :limit" if limit is not None else ""
+
+def _column_to_array(values: Tuple[Any, ...], interval_format: str) -> Optional[pd.Series]:
+    """Turn one batch of a result column into a typed array, None when the batch is all NULL"""
+    first = next((value for value in values if value is not None), None)
+    if first is None:
+        return None
+    if not hasattr(first, 'total_seconds'):
+        return pd.Series(values)
+
+    durations = pd.to_timedelta(values)
+    if interval_format == "seconds":
+        return pd.Series(durations.total_seconds().to_numpy())
+    return pd.Series(durations.to_numpy())
+
+def _concat_column(chunks: List[Optional[pd.Series]], sizes: List[int]) -> pd.Series:
+    """Join the per-batch arrays of one column; all-NULL batches take the type of the others"""
+    typed = next((chunk for chunk in chunks if chunk is not None), None)
+    if typed is None:
+        return pd.Series([None] * sum(sizes), dtype=object)
+
+    def nulls(size: int) -> pd.Series:
+        if typed.dtype == object:
+            return pd.Series([None] * size, dtype=object)
+        return typed.iloc[:0].reindex(range(size))
+
+    return pd.concat(
+        [chunk if chunk is not None else nulls(size) for chunk, size in zip(chunks, sizes)],
+        ignore_index=True,
+    )
+
+# Schema catalog: columns of every public table, loaded with one information_schema query
+SCHEMA_CATALOG_QUERY = """
+    SELECT table_name, column_name, data_type, udt_name
+    FROM information_schema.columns
+    WHERE table_schema = 'public'
+    ORDER BY table_name, ordinal_position
+"""
+
+# Cheap DDL change detection without touching information_schema: the pg_class rows of the
+# public relations (new xmin when a table is created, dropped or altered in place) plus their
+# pg_attribute rows, as DROP COLUMN, RENAME COLUMN and ALTER COLUMN TYPE only update those
+SCHEMA_VERSION_QUERY = """
+    SELECT md5(
+        COALESCE((
+            SELECT string_agg(c.oid::text || ':' || c.xmin::text, ',' ORDER BY c.oid)
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+        ), '') || ';' ||
+        COALESCE((
+            SELECT string_agg(
+                a.attrelid::text || ':' || a.attnum::text || ':' || a.attname || ':'
+                    || a.atttypid::text || ':' || a.attisdropped::text,
+                ',' ORDER BY a.attrelid, a.attnum
+            )
+            FROM pg_attribute a
+            JOIN pg_class c ON c.oid = a.attrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p', 'v', 'm', 'f') AND a.attnum > 0
+        ), '')
+    ) AS version
+"""
+
+# How often, in seconds, the schema catalog checks for DDL changes
+SCHEMA_CHECK_SECONDS = float(os.getenv('SCHEMA_CHECK_SECONDS', 60))
+
+# Aggregates accepted by get_aggregated_results
+AGGREGATE_FUNCTIONS = {
+    "COUNT": func.count,
+    "SUM": func.sum,
+    "AVG": func.avg,
+    "MIN": func.min,
+    "MAX": func.max,
+}
+
+# Text columns of the join stored as categoricals in compact frames (few distinct values)
+RACE_RESULTS_CATEGORY_COLUMNS = ("race_edition", "race_location", "gender", "city", "state", "country")
+RACE_RESULTS_DATE_COLUMNS = ("race_date", "date_of_birth")
+
+def compact_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrink a race results frame in place: float64 seconds, small integers,
+    categoricals for low-cardinality text and datetime64 dates
+    """
+    for column in frame.columns:
+        values = frame[column]
+        if column in RACE_RESULTS_DATE_COLUMNS:
+            frame[column] = pd.to_datetime(values, errors="coerce")
+        elif column in RACE_RESULTS_CATEGORY_COLUMNS:
+            frame[column] = values.astype("category")
+        elif column in RESULT_TIME_COLUMNS:
+            frame[column] = pd.to_numeric(values, errors="coerce").astype("float64")
+        elif column == "id" or column.endswith("_id") or column.endswith("_rank"):
+            numbers = pd.to_numeric(values, errors="coerce")
+            if numbers.isna().any():
+                frame[column] = numbers.astype("Int32")
+            else:
+                frame[column] = pd.to_numeric(numbers, downcast="integer")
+    return frame
+
+@lru_cache(maxsize=256)
+def _statement_sql(statement: Executable) -> str:
+    """SQL text of a prebuilt statement, compiled once for query fingerprints"""
+    return str(statement)
+
+class _QueryTimer:
+    """Splits the time spent on one query into phases, see backend.utils.query_stats"""
+
+    def __init__(self, query: Union[str, Executable]):
+        self.sql = query if isinstance(query, str) else _statement_sql(query)
+        self.rows = 0
+        self.phases: Dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    def phase(self, name: str) -> None:
+        """End the current phase, attributing the time since the previous one to ``name``"""
+        now = time.perf_counter()
+        self.phases[name] = self.phases.get(name, 0.0) + now - self._started
+        self._started = now
+
+@contextmanager
+def _timed_query(query: Union[str, Executable]) -> Iterator[_QueryTimer]:
+    """Record a query's phases, row count and failure in query_stats"""
+    timer = _QueryTimer(query)
+    try:
+        with query_stats.timing_query():
+            yield timer
+    except Exception:
+        # Time up to the failure goes to the phase that was running, usually execute or fetch
+        timer.phase("fetch" if "execute" in timer.phases else "execute")
+        query_stats.record(timer.sql, timer.rows, error=True, **timer.phases)
+        raise
+    query_stats.record(timer.sql, timer.rows, **timer.phases)
+
 class DatabaseController:
-    def __init__(self):
-        # Construct Database URL
-        self.database_url = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-        self.engine = create_engine(self.database_url)
+    def __init__(self, database_url: str = DATABASE_URL):
+        # Share the engine (and its connection pool) with the rest of the backend
+        self.database_url = database_url
+        self.engine = get_engine(database_url)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        # Read dashboard aggregates from the precomputed summary tables
+        self.use_summary_tables = os.getenv('RESULTS_SUMMARY_TABLES', 'false').lower() == 'true'
+        # Reflected tables and the statements built from them, one per query shape
+        self._metadata = MetaData()
+        self._reflect_lock = Lock()
+        self._statements: Dict[Tuple[Any, ...], Executable] = {}
+        # Schema catalog, see get_schema_catalog
+        self._schema_lock = Lock()
+        self._schema: Optional[Dict[str, List[Dict[str, str]]]] = None
+        self._schema_version: Optional[str] = None
+        self._schema_checked_at = 0.0
 
     def get_db_session(self):
         """Create and return a new database session"""
         return self.SessionLocal()
 
-    def execute_query(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    def execute_query(self,
+                      query: Union[str, Executable],
+                      params: Optional[Dict[str, Any]] = None,
+                      interval_format: str = "string") -> List[Dict[str, Any]]:
         """
-        Execute a raw SQL query and return results as a list of dictionaries
+        Execute a SQL query and return results as a list of dictionaries
+
+        Args:
+            query (Union[str, Executable]): Raw SQL or a prebuilt statement to execute
+            params (Optional[Dict[str, Any]]): Bound query parameters
+            interval_format (str): How interval/duration values are returned:
+                "string" (HH:MM:SS.mmm, the default), "seconds" (float) or
+                "timedelta" (as returned by the driver)
+
+        Returns:
+            List[Dict[str, Any]]: Query results
         """
+        if interval_format not in INTERVAL_FORMATS:
+            raise ValueError(f"interval_format must be one of {INTERVAL_FORMATS}, got {interval_format!r}")
+
         try:
-            with self.get_db_session() as session:
-                result = session.execute(text(query), params or {})
-                columns = result.keys()
+            with self.get_db_session() as session, _timed_query(query) as timer:
+                statement = text(query) if isinstance(query, str) else query
+                result = session.execute(statement, params or {})
+                timer.phase("execute")
+                columns = list(result.keys())
+                rows = result.fetchall()
+                timer.rows = len(rows)
+                timer.phase("fetch")
+
+                if interval_format == "timedelta":
+                    formatted_results = [dict(zip(columns, row)) for row in rows]
+                    timer.phase("format")
+                    return formatted_results
+
+                if interval_format == "seconds":
+                    formatted_results = [dict(zip(columns, row)) for row in _intervals_to_seconds(rows, len(columns))]
+                    timer.phase("format")
+                    return formatted_results
                 
                 # Convert row results to list of dicts with proper type handling
                 formatted_results = []
-                for row in result.fetchall():
+                for row in rows:
                     formatted_row = {}
                     for idx, (column, value) in enumerate(zip(columns, row)):
                         if value is None:
                             formatted_row[column] = None
                         elif hasattr(value, 'total_seconds'):  # Check if it's a duration/interval
-                            # Convert to HH:MM:SS.mmm format
-                            total_seconds = value.total_seconds()
-                            hours = int(total_seconds // 3600)
-                            minutes = int((total_seconds % 3600) // 60)
-                            seconds = total_seconds % 60
-                            formatted_row[column] = f"{hours:02d}:{minutes:02d}:{seconds:06.3f}"
+                            formatted_row[column] = format_interval(value)
                         else:
                             formatted_row[column] = value
                     formatted_results.append(formatted_row)
                 
+                timer.phase("format")
                 return formatted_results
         except Exception as e:
             print(f"Error executing query: {str(e)}")
             raise
 
-    def get_all_results(self, table_name: str, limit: int = 500) -> List[Dict[str, Any]]:
+    def execute_statement(self, query: str, params: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Execute a raw SQL statement that modifies data or schema and commit it
+
+        Returns:
+            int: Number of rows affected, as reported by the driver
+        """
+        try:
+            with self.get_db_session() as session, _timed_query(query) as timer:
+                result = session.execute(text(query), params or {})
+                session.commit()
+                timer.rows = max(result.rowcount, 0)
+                timer.phase("execute")
+                return result.rowcount
+        except Exception as e:
+            print(f"Error executing statement: {str(e)}")
+            raise
+
+    def copy_rows(self, table_name: str, frame: pd.DataFrame) -> int:
+        """
+        Load a DataFrame into a table with a single COPY ... FROM STDIN
+
+        Frame columns must match table columns; missing values are loaded as NULL.
+
+        Returns:
+            int: Number of rows loaded
+        """
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+
+        connection = self.engine.raw_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {table_name} ({', '.join(frame.columns)}) FROM STDIN WITH (FORMAT csv)",
+                    buffer,
+                )
+            connection.commit()
+            return len(frame)
+        except Exception as e:
+            connection.rollback()
+            print(f"Error copying rows into {table_name}: {str(e)}")
+            raise
+        finally:
+            connection.close()
+
+    def fetch_frame(self,
+                    query: Union[str, Executable],
+                    params: Optional[Dict[str, Any]] = None,
+                    batch_size: int = 10000,
+                    interval_format: str = "seconds") -> pd.DataFrame:
+        """
+        Execute a raw SQL query and return results as a pandas DataFrame
+
+        Rows are streamed from a server-side cursor in batches; each batch is
+        converted to typed column arrays straight away and the arrays are
+        concatenated at the end, so no per-row dictionaries are ever built.
+
+        Args:
+            query (Union[str, Executable]): Raw SQL or a prebuilt statement to execute
+            params (Optional[Dict[str, Any]]): Bound query parameters
+            batch_size (int): Number of rows fetched from the cursor per batch
+            interval_format (str): "seconds" (float64) or "timedelta" (timedelta64)
+
+        Returns:
+            pd.DataFrame: Query results, one column per selected column
+        """
+        if interval_format not in FRAME_INTERVAL_FORMATS:
+            raise ValueError(f"interval_format must be one of {FRAME_INTERVAL_FORMATS}, got {interval_format!r}")
+
+        try:
+            with self.get_db_session() as session, _timed_query(query) as timer:
+                result = session.execute(
+                    text(query) if isinstance(query, str) else query,
+                    params or {},
+                    execution_options={"stream_results": True, "max_row_buffer": batch_size},
+                )
+                timer.phase("execute")
+                columns = list(result.keys())
+                chunks = [[] for _ in columns]
+                sizes = []
+
+                # Convert each batch to typed column arrays as it arrives, so only one batch
+                # of Python row objects is alive at a time
+                for batch in result.partitions(batch_size):
+                    timer.rows += len(batch)
+                    timer.phase("fetch")
+                    sizes.append(len(batch))
+                    for column_chunks, values in zip(chunks, zip(*batch)):
+                        column_chunks.append(_column_to_array(values, interval_format))
+                    timer.phase("format")
+
+                frame = pd.DataFrame({
+                    idx: _concat_column(column_chunks, sizes)
+                    for idx, column_chunks in enumerate(chunks)
+                })
+                frame.columns = columns
+                timer.phase("format")
+                return frame
+        except Exception as e:
+            print(f"Error executing query: {str(e)}")
+            raise
+
+    def get_all_results_frame(self, table_name: str, limit: Optional[int] = None) -> pd.DataFrame:
+        """Get all results from a specific table as a DataFrame"""
+        return self.fetch_frame(self._select_all_statement(table_name, limit is not None), {"limit": limit})
+
+    def get_race_results_view(self,
+                              columns: Optional[List[str]] = None,
+                              filters: Optional[Dict[str, Any]] = None,
+                              limit: Optional[int] = None,
+                              compact: bool = False) -> pd.DataFrame:
+        """
+        Get race results joined with their race and athlete in a single query
+
+        Args:
+            columns (Optional[List[str]]): Columns to select, from RACE_RESULTS_VIEW_COLUMNS
+                (all of them when omitted)
+            filters (Optional[Dict[str, Any]]): Equality filters on view columns
+            limit (Optional[int]): Maximum number of results to return (all when None)
+            compact (bool): Return durations as float64 seconds, ids and ranks as the
+                smallest integer type, low-cardinality text as categoricals and dates as datetime64
+
+        Returns:
+            pd.DataFrame: One row per result with the requested columns
+        """
+        columns = list(columns or RACE_RESULTS_VIEW_COLUMNS)
+        filters = filters or {}
+        unknown = [column for column in [*columns, *filters] if column not in RACE_RESULTS_VIEW_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown race results columns: {unknown}")
+
+        select_list = ", ".join(f"{RACE_RESULTS_VIEW_COLUMNS[column]} AS {column}" for column in columns)
+        conditions = " AND ".join(f"{RACE_RESULTS_VIEW_COLUMNS[key]} = :{key}" for key in filters)
+        query = f"""
+            SELECT {select_list}
+            FROM athletes_results r
+            LEFT JOIN athletes_race ra ON ra.id = r.race_id
+            LEFT JOIN athletes_athlete a ON a.id = r.athlete_id
+            {f"WHERE {conditions}" if conditions else ""}
+            ORDER BY r.id
+            {_limit_clause(limit)}
+        """
+        frame = self.fetch_frame(query, {**filters, "limit": limit})
+        return compact_frame(frame) if compact else frame
+
+    def create_summary_tables(self) -> None:
+        """
+        Create the race statistics summary tables, install the triggers that keep them current and fill them
+
+        See backend.utils.results_summary for the table layout.
+        """
+        self.execute_statement(results_summary.create_tables_sql())
+        self.execute_statement(results_summary.install_trigger_sql())
+        self.rebuild_summary_tables()
+
+    def rebuild_summary_tables(self) -> None:
+        """Recompute the summary tables from scratch, e.g. after changing a race's date"""
+        self.execute_statement(results_summary.rebuild_sql())
+
+    def compute_ranks(self, race_ids: Optional[List[int]] = None) -> int:
+        """
+        Recompute segment and overall ranks from the result times, one race at a time
+
+        Args:
+            race_ids (Optional[List[int]]): Races to re-rank (every race when None)
+
+        Returns:
+            int: Number of results whose ranks changed
+        """
+        params = {"race_ids": list(race_ids)} if race_ids is not None else {}
+        return self.execute_statement(results_ranking.rank_sql(race_ids), params)
+
+    def correct_result(self, result_id: int, times: Dict[str, Any]) -> int:
+        """
+        Correct the segment times of one result and re-rank only its race, in a single transaction
+
+        race_overall_time is derived: the same UPDATE sets it to the sum of the four
+        segments, so it cannot be corrected directly.
+
+        Args:
+            result_id (int): Result to correct
+            times (Dict[str, Any]): New values for segment columns of RESULT_TIME_COLUMNS
+
+        Returns:
+            int: Number of results in the race whose ranks changed
+        """
+        segments = [column for column in RESULT_TIME_COLUMNS if column != "race_overall_time"]
+        if "race_overall_time" in times:
+            raise ValueError("race_overall_time is the sum of the segments; correct the segments instead")
+        unknown = [column for column in times if column not in segments]
+        if not times or unknown:
+            raise ValueError(f"Only segment time columns can be corrected, got {list(times)}")
+
+        # SET expressions see the old row, so corrected segments come from the parameters
+        overall = " + ".join(f"CAST(:{column} AS INTERVAL)" if column in times else column for column in segments)
+        assignments = ", ".join([f"{column} = :{column}" for column in times] + [f"race_overall_time = {overall}"])
+        try:
+            with self.get_db_session() as session:
+                race_id = session.execute(
+                    text(f"UPDATE athletes_results SET {assignments} WHERE id = :result_id RETURNING race_id"),
+                    {**times, "result_id": result_id},
+                ).scalar_one()
+                reranked = session.execute(
+                    text(results_ranking.rank_sql([race_id])), {"race_ids": [race_id]}
+                ).rowcount
+                session.commit()
+        except Exception as e:
+            print(f"Error correcting result {result_id}: {str(e)}")
+            raise
+        return reranked
+
+    def get_edition_summary(self) -> pd.DataFrame:
+        """
+        Get the per race edition summary joined with its race
+
+        Returns:
+            pd.DataFrame: One row per edition with participants and average seconds per segment
+        """
+        averages = ", ".join(
+            f"s.{column}_seconds / NULLIF(s.{column}_count, 0) AS {column}" for column in RESULT_TIME_COLUMNS
+        )
+        query = f"""
+            SELECT s.race_id, ra.race_edition, ra.race_date, ra.race_location, s.participants, {averages}
+            FROM {results_summary.EDITION_SUMMARY_TABLE} s
+            LEFT JOIN athletes_race ra ON ra.id = s.race_id
+            ORDER BY ra.race_date
+        """
+        return self.fetch_frame(query)
+
+    def get_participants_by_year(self) -> pd.DataFrame:
+        """
+        Count results (finishers) per race year
+
+        Returns:
+            pd.DataFrame: Columns ``year`` and ``participants``, ordered by year
+        """
+        if self.use_summary_tables:
+            query = f"""
+                SELECT race_year AS year, participants
+                FROM {results_summary.YEAR_SUMMARY_TABLE}
+                ORDER BY race_year
+            """
+            return self.fetch_frame(query)
+
+        query = """
+            SELECT year, COUNT(*) AS participants
+            FROM (
+                SELECT CAST(EXTRACT(YEAR FROM ra.race_date) AS INTEGER) AS year
+                FROM athletes_results r
+                JOIN athletes_race ra ON ra.id = r.race_id
+            ) years
+            GROUP BY year
+            ORDER BY year
+        """
+        return self.fetch_frame(query)
+
+    def get_average_segment_times(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Average duration of each race segment
+
+        Args:
+            columns (Optional[List[str]]): Duration columns to average, from RESULT_TIME_COLUMNS
+                (all of them when omitted)
+
+        Returns:
+            pd.DataFrame: Columns ``segment`` and ``average_seconds``, one row per column
+        """
+        columns = list(columns or RESULT_TIME_COLUMNS)
+        unknown = [column for column in columns if column not in RESULT_TIME_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown result time columns: {unknown}")
+
+        if self.use_summary_tables:
+            query = results_summary.average_seconds_sql(columns)
+        else:
+            averages = ", ".join(
+                f"CAST(AVG(EXTRACT(EPOCH FROM r.{column})) AS DOUBLE PRECISION) AS {column}" for column in columns
+            )
+            query = f"SELECT {averages} FROM athletes_results r"
+        frame = self.fetch_frame(query)
+        return frame.melt(var_name="segment", value_name="average_seconds")
+
+    def get_top_athletes(self, limit: int = 10) -> pd.DataFrame:
+        """
+        Athletes with the most race participations
+
+        Args:
+            limit (int): Number of athletes to return
+
+        Returns:
+            pd.DataFrame: Columns ``athlete_id``, ``first_name``, ``eternal_number`` and
+                ``participations``, most participations first
+        """
+        if self.use_summary_tables:
+            query = f"""
+                SELECT s.athlete_id, a.first_name, a.eternal_number, s.participations
+                FROM {results_summary.ATHLETE_SUMMARY_TABLE} s
+                JOIN athletes_athlete a ON a.id = s.athlete_id
+                ORDER BY s.participations DESC, s.athlete_id
+                LIMIT :limit
+            """
+            return self.fetch_frame(query, {"limit": limit})
+
+        query = """
+            SELECT r.athlete_id, a.first_name, a.eternal_number, COUNT(r.id) AS participations
+            FROM athletes_results r
+            JOIN athletes_athlete a ON a.id = r.athlete_id
+            GROUP BY r.athlete_id, a.first_name, a.eternal_number
+            ORDER BY participations DESC, r.athlete_id
+            LIMIT :limit
+        """
+        return self.fetch_frame(query, {"limit": limit})
+
+    def get_age_distribution(self, min_age: int = 0) -> pd.DataFrame:
+        """
+        Count results per athlete age (in whole years, as of today)
+
+        Args:
+            min_age (int): Only ages strictly greater than this are returned
+
+        Returns:
+            pd.DataFrame: Columns ``age`` and ``participants``, ordered by age
+        """
+        if self.use_summary_tables:
+            query = f"""
+                SELECT age, SUM(participations) AS participants
+                FROM (
+                    SELECT (CURRENT_DATE - a.date_of_birth) / 365 AS age, s.participations
+                    FROM {results_summary.ATHLETE_SUMMARY_TABLE} s
+                    JOIN athletes_athlete a ON a.id = s.athlete_id
+                    WHERE a.date_of_birth IS NOT NULL
+                ) ages
+                WHERE age > :min_age
+                GROUP BY age
+                ORDER BY age
+            """
+            return self.fetch_frame(query, {"min_age": min_age})
+
+        query = """
+            SELECT age, COUNT(*) AS participants
+            FROM (
+                SELECT (CURRENT_DATE - a.date_of_birth) / 365 AS age
+                FROM athletes_results r
+                JOIN athletes_athlete a ON a.id = r.athlete_id
+                WHERE a.date_of_birth IS NOT NULL
+            ) ages
+            WHERE age > :min_age
+            GROUP BY age
+            ORDER BY age
+        """
+        return self.fetch_frame(query, {"min_age": min_age})
+
+    def get_data_version(self, tables: List[str]) -> str:
+        """
+        Get a version string for the given tables that changes whenever their data changes
+
+        Combines each table's max id (new rows, immediately) with its insert/update/delete
+        counters from pg_stat_user_tables (corrections and deletes, once statistics are flushed).
+
+        Args:
+            tables (List[str]): Table names
+
+        Returns:
+            str: Opaque version, equal across processes for unchanged data
+        """
+        query = " UNION ALL ".join(
+            f"""
+            SELECT '{table}' AS table_name,
+                   (SELECT MAX(id) FROM {table}) AS max_id,
+                   (SELECT n_tup_ins + n_tup_upd + n_tup_del
+                    FROM pg_stat_user_tables WHERE relname = '{table}') AS changes
+            """
+            for table in tables
+        )
+        rows = self.execute_query(query)
+        return ";".join(f"{row['table_name']}:{row['max_id']}:{row['changes']}" for row in rows)
+
+    def get_schema_catalog(self, refresh: bool = False) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Get the columns of every public table, loaded once and shared by all callers
+
+        The catalog is reloaded when ``refresh`` is set, or when a DDL change is
+        detected (checked at most every SCHEMA_CHECK_SECONDS with a pg_class query).
+        Reloading also drops the reflected tables and statements built from them.
+
+        Returns:
+            Dict[str, List[Dict[str, str]]]: Table name -> column information, as get_table_schema
+        """
+        with self._schema_lock:
+            now = time.monotonic()
+            if refresh or self._schema is None or now - self._schema_checked_at >= SCHEMA_CHECK_SECONDS:
+                version = self.execute_query(SCHEMA_VERSION_QUERY)[0]["version"]
+                if refresh or self._schema is None or version != self._schema_version:
+                    catalog: Dict[str, List[Dict[str, str]]] = {}
+                    for column in self.execute_query(SCHEMA_CATALOG_QUERY):
+                        catalog.setdefault(column.pop("table_name"), []).append(column)
+                    with self._reflect_lock:
+                        self._metadata = MetaData()
+                        self._statements = {}
+                    self._schema = catalog
+                    self._schema_version = version
+                self._schema_checked_at = now
+            return self._schema
+
+    def refresh_schema(self) -> None:
+        """Reload the schema catalog, e.g. right after a migration"""
+        self.get_schema_catalog(refresh=True)
+
+    def _reflected_table(self, table_name: str) -> Table:
+        """Reflect a table once and reuse it; tables missing from the catalog raise ValueError"""
+        if table_name not in self.get_schema_catalog():
+            raise ValueError(f"Unknown table: {table_name!r}")
+        with self._reflect_lock:
+            table = self._metadata.tables.get(table_name)
+            if table is None:
+                try:
+                    table = Table(table_name, self._metadata, autoload_with=self.engine)
+                except NoSuchTableError:
+                    raise ValueError(f"Unknown table: {table_name!r}")
+            return table
+
+    def _table_columns(self, table_name: str, columns: List[str]) -> List[Any]:
+        """Look up columns of a reflected table; columns missing from the catalog raise ValueError"""
+        table = self._reflected_table(table_name)
+        known = {column["column_name"] for column in self.get_schema_catalog().get(table_name, [])}
+        unknown = [column for column in columns if column not in known or column not in table.c]
+        if unknown:
+            raise ValueError(f"Unknown columns for {table_name}: {unknown}")
+        return [table.c[column] for column in columns]
+
+    def _cached_statement(self, shape: Tuple[Any, ...], build: Callable[[], Executable]) -> Executable:
+        """
+        Build the statement for a query shape once and reuse it on later calls
+
+        Values are always bound parameters, so repeated calls share the statement
+        and SQLAlchemy's compiled form of it.
+        """
+        statement = self._statements.get(shape)
+        if statement is None:
+            statement = self._statements[shape] = build()
+        return statement
+
+    def _select_all_statement(self, table_name: str, limited: bool) -> Executable:
+        def build():
+            statement = select(self._reflected_table(table_name))
+            return statement.limit(bindparam("limit")) if limited else statement
+        return self._cached_statement(("all", table_name, limited), build)
+
+    def get_all_results(self,
+                        table_name: str,
+                        limit: Optional[int] = None,
+                        interval_format: str = "string") -> List[Dict[str, Any]]:
         """Get all results from a specific table"""
-        query = f"SELECT * FROM {table_name} LIMIT :limit"
-        return self.execute_query(query, {"limit": limit})
+        statement = self._select_all_statement(table_name, limit is not None)
+        return self.execute_query(statement, {"limit": limit}, interval_format=interval_format)
 
     def get_results_by_filter(self, 
                             table_name: str, 
                             filters: Dict[str, Any],
-                            limit: int = 500) -> List[Dict[str, Any]]:
+                            limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get filtered results from a specific table"""
-        conditions = " AND ".join([f"{key} = :{key}" for key in filters.keys()])
-        query = f"SELECT * FROM {table_name} WHERE {conditions} LIMIT :limit"
+        keys = tuple(sorted(filters))
+
+        def build():
+            conditions = [column == bindparam(key) for key, column in zip(keys, self._table_columns(table_name, list(keys)))]
+            statement = select(self._reflected_table(table_name)).where(*conditions)
+            return statement.limit(bindparam("limit")) if limit is not None else statement
+
+        statement = self._cached_statement(("filter", table_name, keys, limit is not None), build)
         params = {**filters, "limit": limit}
-        return self.execute_query(query, params)
+        return self.execute_query(statement, params)
+
+    def get_distinct_values(self, table_name: str, column: str, limit: int = 1000) -> List[Any]:
+        """
+        Get the distinct values of a column, in order, for filter dropdowns
+
+        Args:
+            table_name (str): Name of the table to query
+            column (str): Column whose values are listed
+            limit (int): Maximum number of values returned
+
+        Returns:
+            List[Any]: Distinct values (intervals formatted as in execute_query)
+        """
+        def build():
+            [value_column] = self._table_columns(table_name, [column])
+            return select(value_column).distinct().order_by(value_column).limit(bindparam("limit"))
+
+        statement = self._cached_statement(("distinct", table_name, column), build)
+        return [row[column] for row in self.execute_query(statement, {"limit": limit})]
+
+    def get_primary_key(self, table_name: str) -> Optional[str]:
+        """Get the primary key column of a table, None unless it is a single column"""
+        primary_key = list(self._reflected_table(table_name).primary_key.columns)
+        return primary_key[0].name if len(primary_key) == 1 else None
+
+    def get_sortable_columns(self, table_name: str) -> List[str]:
+        """Get the columns get_results_window can sort on: the primary key and non-nullable columns"""
+        return [column.name for column in self._reflected_table(table_name).c if column.primary_key or not column.nullable]
+
+    def count_rows(self, table_name: str, filters: Optional[Dict[str, Any]] = None) -> int:
+        """Count the rows of a table matching equality filters"""
+        filters = filters or {}
+        keys = tuple(sorted(filters))
+
+        def build():
+            conditions = [column == bindparam(key) for key, column in zip(keys, self._table_columns(table_name, list(keys)))]
+            return select(func.count().label("row_count")).select_from(self._reflected_table(table_name)).where(*conditions)
+
+        statement = self._cached_statement(("count", table_name, keys), build)
+        return self.execute_query(statement, filters)[0]["row_count"]
+
+    def get_results_window(self,
+                           table_name: str,
+                           filters: Optional[Dict[str, Any]] = None,
+                           sort_column: Optional[str] = None,
+                           descending: bool = False,
+                           after: Optional[Tuple[Any, Any]] = None,
+                           page_size: int = 100,
+                           interval_format: str = "timedelta") -> List[Dict[str, Any]]:
+        """
+        Get one page of a filtered, sorted table with keyset pagination
+
+        Rows are ordered by (sort_column, primary key), so pages stay stable and each
+        one is an index seek past the previous page rather than an OFFSET scan.
+        Intervals are returned as exact timedeltas by default so cursors built from
+        the rows match the stored values; format them for display with
+        format_interval_rows.
+
+        Args:
+            table_name (str): Name of the table to query; it needs a single-column primary key
+            filters (Optional[Dict[str, Any]]): Equality filters
+            sort_column (Optional[str]): Column to sort on, from get_sortable_columns
+                (the primary key when None)
+            descending (bool): Sort in descending order
+            after (Optional[Tuple[Any, Any]]): (sort value, key) of the last row of the
+                previous page, see window_cursor (first page when None)
+            page_size (int): Maximum number of rows in the page
+            interval_format (str): How interval values are returned, see execute_query; keep
+                "timedelta" when building cursors on an interval sort column
+
+        Returns:
+            List[Dict[str, Any]]: Rows of the page, in order
+        """
+        key_name = self.get_primary_key(table_name)
+        if key_name is None:
+            raise ValueError(f"{table_name} has no single-column primary key to page on")
+        sort_column = sort_column or key_name
+        if sort_column not in self.get_sortable_columns(table_name):
+            raise ValueError(f"Cannot sort {table_name} on {sort_column!r}")
+        filters = filters or {}
+        keys = tuple(sorted(filters))
+
+        def build():
+            table = self._reflected_table(table_name)
+            key, sort = table.c[key_name], table.c[sort_column]
+            conditions = [column == bindparam(name) for name, column in zip(keys, self._table_columns(table_name, list(keys)))]
+            if after is not None:
+                position = tuple_(sort, key)
+                cursor = tuple_(bindparam("after_sort"), bindparam("after_key"))
+                conditions.append(position < cursor if descending else position > cursor)
+            order = [sort, key] if sort is not key else [key]
+            return (
+                select(table)
+                .where(*conditions)
+                .order_by(*(column.desc() if descending else column for column in order))
+                .limit(bindparam("page_size"))
+            )
+
+        shape = ("window", table_name, keys, sort_column, descending, after is not None)
+        statement = self._cached_statement(shape, build)
+        params = {**filters, "page_size": page_size}
+        if after is not None:
+            params["after_sort"], params["after_key"] = after
+        return self.execute_query(statement, params, interval_format=interval_format)
+
+    def window_cursor(self, table_name: str, row: Dict[str, Any], sort_column: Optional[str] = None) -> Tuple[Any, Any]:
+        """Build the ``after`` cursor of get_results_window from the last row of a page"""
+        key_name = self.get_primary_key(table_name)
+        return row[sort_column or key_name], row[key_name]
 
     def get_results_by_date_range(self,
                                 table_name: str,
                                 date_column: str,
                                 start_date: datetime,
                                 end_date: datetime,
-                                limit: int = 500) -> List[Dict[str, Any]]:
+                                limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get results within a date range"""
-        query = f"""
-            SELECT * FROM {table_name}
-            WHERE {date_column} BETWEEN :start_date AND :end_date
-            LIMIT :limit
-        """
+        def build():
+            [column] = self._table_columns(table_name, [date_column])
+            statement = select(self._reflected_table(table_name)).where(
+                column.between(bindparam("start_date"), bindparam("end_date"))
+            )
+            return statement.limit(bindparam("limit")) if limit is not None else statement
+
+        statement = self._cached_statement(("date_range", table_name, date_column, limit is not None), build)
         params = {
             "start_date": start_date,
             "end_date": end_date,
             "limit": limit
         }
-        return self.execute_query(query, params)
+        return self.execute_query(statement, params)
+
+    def get_results_page(self,
+                         table_name: str,
+                         after: Optional[Any] = None,
+                         batch_size: int = 500,
+                         key_column: Optional[str] = None,
+                         interval_format: str = "string") -> List[Dict[str, Any]]:
+        """
+        Get one page of results ordered by key, starting after a given key (keyset pagination)
+
+        Args:
+            table_name (str): Name of the table to query
+            after (Optional[Any]): Last key of the previous page (first page when None)
+            batch_size (int): Maximum number of rows in the page
+            key_column (Optional[str]): Unique column to page on (the primary key when None)
+            interval_format (str): How interval values are returned, see execute_query
+
+        Returns:
+            List[Dict[str, Any]]: Rows with key greater than ``after``, in key order
+        """
+        key_column = self._page_key(table_name, key_column)
+
+        def build():
+            [key] = self._table_columns(table_name, [key_column])
+            statement = select(self._reflected_table(table_name))
+            if after is not None:
+                statement = statement.where(key > bindparam("after"))
+            return statement.order_by(key).limit(bindparam("batch_size"))
+
+        statement = self._cached_statement(("page", table_name, key_column, after is not None), build)
+        params = {"after": after, "batch_size": batch_size}
+        return self.execute_query(statement, params, interval_format=interval_format)
+
+    def _page_key(self, table_name: str, key_column: Optional[str]) -> str:
+        """Resolve the key get_results_page seeks on; it must be the primary key or a unique column"""
+        if key_column is None:
+            key_column = self.get_primary_key(table_name)
+            if key_column is None:
+                raise ValueError(f"{table_name} has no single-column primary key to page on")
+            return key_column
+        self._table_columns(table_name, [key_column])
+        table = self._reflected_table(table_name)
+        unique_keys = [list(table.primary_key.columns)]
+        unique_keys += [list(c.columns) for c in table.constraints if isinstance(c, UniqueConstraint)]
+        unique_keys += [list(index.columns) for index in table.indexes if index.unique]
+        if [key_column] not in [[column.name for column in columns] for columns in unique_keys]:
+            raise ValueError(f"Cannot page {table_name} on {key_column!r}: it is not a unique column")
+        return key_column
+
+    def iter_results(self,
+                     table_name: str,
+                     batch_size: int = 500,
+                     key_column: Optional[str] = None,
+                     interval_format: str = "string") -> Iterator[List[Dict[str, Any]]]:
+        """
+        Stream a whole table in key order, one page of at most ``batch_size`` rows at a time
+
+        Each page is fetched with get_results_page, seeking past the last key of
+        the previous page, so memory stays bounded and no OFFSET scans are made.
+        """
+        key_column = self._page_key(table_name, key_column)
+        after = None
+        while True:
+            page = self.get_results_page(table_name, after, batch_size, key_column, interval_format)
+            if not page:
+                return
+            yield page
+            if len(page) < batch_size:
+                return
+            after = page[-1][key_column]
 
     def get_table_schema(self, table_name: str) -> List[Dict[str, str]]:
         """
-        Get the schema information for a table
+        Get the schema information for a table, from the schema catalog
         
         Args:
             table_name (str): Name of the table
@@ -95,13 +999,7 @@ class DatabaseController:
         Returns:
             List[Dict[str, str]]: List of column information
         """
-        query = """
-            SELECT column_name, data_type, udt_name
-            FROM information_schema.columns
-            WHERE table_name = :table_name
-            ORDER BY ordinal_position;
-        """
-        return self.execute_query(query, {"table_name": table_name})
+        return [dict(column) for column in self.get_schema_catalog().get(table_name, [])]
 
     def get_all_tables(self) -> List[str]:
         """
@@ -110,14 +1008,8 @@ class DatabaseController:
         Returns:
             List[str]: List of table names
         """
-        query = """
-            SELECT table_name 
-            FROM information_schema.tables 
-            WHERE table_schema = 'public'
-        """
         try:
-            results = self.execute_query(query)
-            return [result['table_name'] for result in results]
+            return list(self.get_schema_catalog())
         except Exception as e:
             print(f"Error getting tables: {str(e)}")
             raise
@@ -165,20 +1057,26 @@ class DatabaseController:
             table_name (str): Name of the table to query
             group_by_column (str): Column to group by
             agg_column (str): Column to aggregate
-            agg_function (str): Aggregation function to use (COUNT, SUM, AVG, etc.)
+            agg_function (str): Aggregation function to use, one of AGGREGATE_FUNCTIONS
             limit (int): Maximum number of results to return
             
         Returns:
             List[Dict[str, Any]]: Aggregated query results
         """
-        query = f"""
-            SELECT {group_by_column},
-                   {agg_function}({agg_column}) as aggregated_value
-            FROM {table_name}
-            GROUP BY {group_by_column}
-            LIMIT :limit
-        """
-        return self.execute_query(query, {"limit": limit})
+        agg_function = agg_function.upper()
+        if agg_function not in AGGREGATE_FUNCTIONS:
+            raise ValueError(f"agg_function must be one of {list(AGGREGATE_FUNCTIONS)}, got {agg_function!r}")
+
+        def build():
+            group_column, value_column = self._table_columns(table_name, [group_by_column, agg_column])
+            return (
+                select(group_column, AGGREGATE_FUNCTIONS[agg_function](value_column).label("aggregated_value"))
+                .group_by(group_column)
+                .limit(bindparam("limit"))
+            )
+
+        statement = self._cached_statement(("aggregate", table_name, group_by_column, agg_column, agg_function), build)
+        return self.execute_query(statement, {"limit": limit})
 
 # Create a singleton instance
 db_controller = DatabaseController()
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+Bulk import of a race edition's result sheet (CSV/XLSX) into athletes_results
+
+The sheet is checked as a whole with the same invariants as Results.clean(),
+every violation is reported at once, and the valid rows are loaded with a
+single COPY.
+"""
+from numbers import Number
+from typing import Optional, Tuple
+import os
+import pandas as pd
+
+from backend.helpers.results_controler import RESULT_RANK_COLUMNS, RESULT_TIME_COLUMNS
+from backend.utils.results_controller import DatabaseController, db_controller
+from backend.utils.time_conversor import durations_to_seconds
+
+# Segments that must add up to race_overall_time (see Results.clean)
+SEGMENT_TIME_COLUMNS = [column for column in RESULT_TIME_COLUMNS if column != "race_overall_time"]
+RESULT_SHEET_COLUMNS = ["athlete_id", "race_id", *RESULT_TIME_COLUMNS, *RESULT_RANK_COLUMNS]
+
+def read_result_sheet(path: str) -> pd.DataFrame:
+    """
+    Read a result sheet from a .csv, .xls or .xlsx file
+
+    Excel stores durations as fractions of a day, so numeric cells in the time
+    columns of a workbook are converted to seconds; in CSV files they already are.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in (".xlsx", ".xls"):
+        return pd.read_csv(path)
+
+    sheet = pd.read_excel(path)
+    for column in sheet.columns:
+        if str(column).strip() in RESULT_TIME_COLUMNS:
+            sheet[column] = sheet[column].map(
+                lambda value: value * 86400 if isinstance(value, Number) and not isinstance(value, bool) else value
+            )
+    return sheet
+
+def prepare_results(sheet: pd.DataFrame, race_id: Optional[int] = None) -> pd.DataFrame:
+    """
+    Select the athletes_results columns from a sheet and convert them to typed columns
+
+    Durations may be given as "H:MM:SS" strings, time cells, timedeltas or numbers of
+    seconds (see durations_to_seconds), and are rounded to the millisecond; values that
+    cannot be parsed become NaT and are reported as null times by validate_results.
+
+    Args:
+        sheet (pd.DataFrame): Raw sheet
+        race_id (Optional[int]): Race edition for every row, when the sheet has no race_id column
+    """
+    sheet = sheet.rename(columns=lambda column: str(column).strip())
+    if race_id is not None:
+        sheet = sheet.assign(race_id=race_id)
+
+    missing = [column for column in RESULT_SHEET_COLUMNS if column not in sheet.columns]
+    if missing:
+        raise ValueError(f"Result sheet is missing columns: {missing}")
+
+    results = pd.DataFrame(index=sheet.index)
+    for column in ("athlete_id", "race_id", *RESULT_RANK_COLUMNS):
+        results[column] = pd.to_numeric(sheet[column], errors="coerce")
+    for column in RESULT_TIME_COLUMNS:
+        seconds = durations_to_seconds(sheet[column].reset_index(drop=True))
+        results[column] = pd.to_timedelta(seconds, unit="s").round("ms").set_axis(sheet.index)
+    return results[RESULT_SHEET_COLUMNS]
+
+def validate_results(results: pd.DataFrame, existing: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Check Results.clean() invariants over the whole batch at once
+
+    Args:
+        results (pd.DataFrame): Prepared results, see prepare_results
+        existing (Optional[pd.DataFrame]): ``athlete_id``/``race_id`` pairs already stored,
+            so rows that would break the unique constraint are reported instead of aborting the COPY
+
+    Returns:
+        pd.DataFrame: One row per violation with columns ``row`` (sheet row index),
+            ``field`` and ``error``; empty when every row is valid
+    """
+    violations = []
+
+    def flag(mask: pd.Series, field: str, error: str) -> None:
+        violations.append(pd.DataFrame({"row": results.index[mask.to_numpy()], "field": field, "error": error}))
+
+    def not_integer(column: str) -> pd.Series:
+        return results[column].notna() & (results[column] % 1 != 0)
+
+    for column in ("athlete_id", "race_id"):
+        flag(results[column].isna(), column, "Reference cannot be null")
+        flag(not_integer(column), column, "Reference must be an integer")
+
+    for column in RESULT_TIME_COLUMNS:
+        flag(results[column].isna(), column, "Time cannot be null")
+
+    complete = results[RESULT_TIME_COLUMNS].notna().all(axis=1)
+    total_duration = results[SEGMENT_TIME_COLUMNS].sum(axis=1)
+    flag(
+        complete & (results["race_overall_time"] != total_duration),
+        "race_overall_time",
+        "Overall time is not equal to the sum of the individual times",
+    )
+
+    for column in RESULT_RANK_COLUMNS:
+        flag(~(results[column] > 0), column, "Rank must be a positive number")
+        flag(not_integer(column), column, "Rank must be an integer")
+
+    flag(
+        results.duplicated(["athlete_id", "race_id"], keep="first"),
+        "athlete_id",
+        "Athlete already has a result for this race",
+    )
+
+    if existing is not None and not existing.empty:
+        stored = pd.MultiIndex.from_frame(existing[["athlete_id", "race_id"]].astype("int64"))
+        keys = pd.MultiIndex.from_frame(results[["athlete_id", "race_id"]])
+        flag(pd.Series(keys.isin(stored), index=results.index), "athlete_id", "Athlete already has a result for this race")
+
+    return pd.concat(violations, ignore_index=True).sort_values("row", kind="stable").reset_index(drop=True)
+
+def load_results(results: pd.DataFrame, controller: DatabaseController = db_controller) -> int:
+    """Load validated results into athletes_results with a single COPY"""
+    rows = results[RESULT_SHEET_COLUMNS].copy()
+    for column in ("athlete_id", "race_id", *RESULT_RANK_COLUMNS):
+        rows[column] = rows[column].astype("int64")
+    for column in RESULT_TIME_COLUMNS:
+        rows[column] = rows[column].dt.total_seconds().astype(str) + " seconds"
+    return controller.copy_rows("athletes_results", rows)
+
+def import_result_sheet(path: str,
+                        race_id: Optional[int] = None,
+                        dry_run: bool = False,
+                        controller: DatabaseController = db_controller) -> Tuple[int, pd.DataFrame]:
+    """
+    Validate a result sheet and load its valid rows
+
+    Args:
+        path (str): CSV/XLSX file with one row per result
+        race_id (Optional[int]): Race edition for every row, when the sheet has no race_id column
+        dry_run (bool): Only validate, do not load anything
+        controller (DatabaseController): Controller used for the COPY
+
+    Returns:
+        Tuple[int, pd.DataFrame]: Number of rows loaded and the violations found
+    """
+    results = prepare_results(read_result_sheet(path), race_id)
+    race_ids = [int(value) for value in results["race_id"].dropna().unique()]
+    existing = controller.fetch_frame(
+        "SELECT athlete_id, race_id FROM athletes_results WHERE race_id = ANY(:race_ids)",
+        {"race_ids": race_ids},
+    )
+    violations = validate_results(results, existing)
+    valid = results.drop(index=violations["row"].unique())
+    if dry_run or valid.empty:
+        return 0, violations
+    return load_results(valid, controller), violations
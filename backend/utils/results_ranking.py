@@ -0,0 +1,41 @@
+"""
+Segment and overall ranks for athletes_results, computed in the database
+
+Every rank column is derived from its time column with one RANK() window per
+segment, partitioned by race, in a single UPDATE statement. Ties share a rank
+(1, 1, 3), missing times rank last, and only rows whose rank changed are written.
+"""
+from typing import List, Optional
+
+from backend.helpers.results_controler import RESULT_RANK_COLUMNS, RESULT_TIME_COLUMNS
+
+# Rank column -> time column it is computed from
+RANKED_COLUMNS = dict(zip(RESULT_RANK_COLUMNS, RESULT_TIME_COLUMNS))
+
+def rank_sql(race_ids: Optional[List[int]] = None) -> str:
+    """
+    UPDATE recomputing every rank column for the given races (all races when None)
+
+    Binds ``:race_ids`` when races are given.
+    """
+    windows = ",\n".join(
+        f"        RANK() OVER (PARTITION BY race_id ORDER BY {time_column} NULLS LAST) AS {rank_column}"
+        for rank_column, time_column in RANKED_COLUMNS.items()
+    )
+    assignments = ",\n".join(f"    {rank_column} = ranked.{rank_column}" for rank_column in RANKED_COLUMNS)
+    changed = "\n    OR ".join(f"r.{rank_column} IS DISTINCT FROM ranked.{rank_column}" for rank_column in RANKED_COLUMNS)
+    race_filter = "WHERE race_id = ANY(:race_ids)" if race_ids is not None else ""
+    return f"""
+UPDATE athletes_results r SET
+{assignments}
+FROM (
+    SELECT id,
+{windows}
+    FROM athletes_results
+    {race_filter}
+) ranked
+WHERE r.id = ranked.id
+AND (
+    {changed}
+)
+"""
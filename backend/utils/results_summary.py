@@ -0,0 +1,170 @@
+"""
+Precomputed race statistics per edition, per year and per athlete
+
+Summaries keep participant counts plus, for each duration column, the sum of
+seconds and the count of non-null values, so averages are SUM / COUNT over a
+handful of rows. Statement triggers on athletes_results keep them current from
+the transition tables: inserted rows are added, deleted rows (including ON DELETE
+CASCADE from athletes and races) are subtracted, and updated rows are subtracted
+with their old values and added back with the new ones. TRUNCATE empties them.
+
+Per-year totals are keyed on the edition summary's race_year, so removing a race
+also removes its results from the right year.
+"""
+from typing import List
+
+from backend.helpers.results_controler import RESULT_TIME_COLUMNS
+
+EDITION_SUMMARY_TABLE = "results_edition_summary"
+YEAR_SUMMARY_TABLE = "results_year_summary"
+ATHLETE_SUMMARY_TABLE = "results_athlete_summary"
+SUMMARY_TABLES = (EDITION_SUMMARY_TABLE, YEAR_SUMMARY_TABLE, ATHLETE_SUMMARY_TABLE)
+
+# Trigger name -> (function name, trigger clause); one trigger per event, as
+# Postgres only allows transition tables on single-event triggers
+SUMMARY_TRIGGERS = {
+    "results_summary_after_insert": (
+        "results_summary_add_new_results",
+        "AFTER INSERT ON athletes_results REFERENCING NEW TABLE AS new_results",
+    ),
+    "results_summary_after_delete": (
+        "results_summary_remove_old_results",
+        "AFTER DELETE ON athletes_results REFERENCING OLD TABLE AS old_results",
+    ),
+    "results_summary_after_update": (
+        "results_summary_replace_results",
+        "AFTER UPDATE ON athletes_results REFERENCING OLD TABLE AS old_results NEW TABLE AS new_results",
+    ),
+    "results_summary_after_truncate": (
+        "results_summary_clear",
+        "AFTER TRUNCATE ON athletes_results",
+    ),
+}
+
+def _duration_columns_ddl() -> str:
+    return ",\n".join(
+        f"    {column}_seconds DOUBLE PRECISION NOT NULL DEFAULT 0,\n"
+        f"    {column}_count INTEGER NOT NULL DEFAULT 0"
+        for column in RESULT_TIME_COLUMNS
+    )
+
+def _duration_columns() -> List[str]:
+    return [name for column in RESULT_TIME_COLUMNS for name in (f"{column}_seconds", f"{column}_count")]
+
+def _duration_aggregates(sign: int) -> str:
+    return ",\n".join(
+        f"    {sign} * COALESCE(SUM(EXTRACT(EPOCH FROM r.{column})), 0), {sign} * COUNT(r.{column})"
+        for column in RESULT_TIME_COLUMNS
+    )
+
+def _accumulate(columns: List[str]) -> str:
+    return ",\n    ".join(f"{column} = s.{column} + EXCLUDED.{column}" for column in columns)
+
+def create_tables_sql() -> str:
+    """DDL for the summary tables (idempotent)"""
+    return f"""
+CREATE TABLE IF NOT EXISTS {EDITION_SUMMARY_TABLE} (
+    race_id INTEGER PRIMARY KEY,
+    race_year INTEGER,
+    participants INTEGER NOT NULL DEFAULT 0,
+{_duration_columns_ddl()}
+);
+CREATE TABLE IF NOT EXISTS {YEAR_SUMMARY_TABLE} (
+    race_year INTEGER PRIMARY KEY,
+    participants INTEGER NOT NULL DEFAULT 0,
+{_duration_columns_ddl()}
+);
+CREATE TABLE IF NOT EXISTS {ATHLETE_SUMMARY_TABLE} (
+    athlete_id INTEGER PRIMARY KEY,
+    participations INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS {ATHLETE_SUMMARY_TABLE}_participations
+    ON {ATHLETE_SUMMARY_TABLE} (participations DESC, athlete_id);
+"""
+
+def accumulate_sql(source: str, sign: int = 1) -> str:
+    """
+    Upserts adding (or, with ``sign=-1``, subtracting) the results in ``source`` to every summary table
+
+    Args:
+        source (str): Relation with the athletes_results columns, either the table
+            itself (full rebuild) or a trigger's transition table (incremental)
+        sign (int): 1 to add the results, -1 to subtract them
+    """
+    duration_columns = _duration_columns()
+    insert_columns = ", ".join(duration_columns)
+    return f"""
+INSERT INTO {EDITION_SUMMARY_TABLE} AS s (race_id, race_year, participants, {insert_columns})
+SELECT r.race_id, CAST(EXTRACT(YEAR FROM ra.race_date) AS INTEGER), {sign} * COUNT(*),
+{_duration_aggregates(sign)}
+FROM {source} r
+LEFT JOIN athletes_race ra ON ra.id = r.race_id
+GROUP BY r.race_id, ra.race_date
+ON CONFLICT (race_id) DO UPDATE SET
+    participants = s.participants + EXCLUDED.participants,
+    {_accumulate(duration_columns)};
+
+INSERT INTO {YEAR_SUMMARY_TABLE} AS s (race_year, participants, {insert_columns})
+SELECT e.race_year, {sign} * COUNT(*),
+{_duration_aggregates(sign)}
+FROM {source} r
+JOIN {EDITION_SUMMARY_TABLE} e ON e.race_id = r.race_id
+WHERE e.race_year IS NOT NULL
+GROUP BY e.race_year
+ON CONFLICT (race_year) DO UPDATE SET
+    participants = s.participants + EXCLUDED.participants,
+    {_accumulate(duration_columns)};
+
+INSERT INTO {ATHLETE_SUMMARY_TABLE} AS s (athlete_id, participations)
+SELECT r.athlete_id, {sign} * COUNT(*)
+FROM {source} r
+GROUP BY r.athlete_id
+ON CONFLICT (athlete_id) DO UPDATE SET
+    participations = s.participations + EXCLUDED.participations;
+"""
+
+def prune_sql() -> str:
+    """Delete summary rows left without results, as a rebuild would not create them"""
+    return f"""
+DELETE FROM {YEAR_SUMMARY_TABLE} WHERE participants <= 0;
+DELETE FROM {EDITION_SUMMARY_TABLE} WHERE participants <= 0;
+DELETE FROM {ATHLETE_SUMMARY_TABLE} WHERE participations <= 0;
+"""
+
+def install_trigger_sql() -> str:
+    """Triggers folding each INSERT, DELETE, UPDATE and TRUNCATE on athletes_results into the summaries"""
+    bodies = {
+        "results_summary_add_new_results": accumulate_sql("new_results"),
+        "results_summary_remove_old_results": accumulate_sql("old_results", -1) + prune_sql(),
+        "results_summary_replace_results": (
+            accumulate_sql("old_results", -1) + accumulate_sql("new_results") + prune_sql()
+        ),
+        "results_summary_clear": f"TRUNCATE {', '.join(SUMMARY_TABLES)};",
+    }
+    statements = []
+    for trigger, (function, clause) in SUMMARY_TRIGGERS.items():
+        statements.append(f"""
+CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+BEGIN
+{bodies[function]}
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS {trigger} ON athletes_results;
+CREATE TRIGGER {trigger}
+    {clause}
+    FOR EACH STATEMENT EXECUTE FUNCTION {function}();
+""")
+    return "".join(statements)
+
+def rebuild_sql() -> str:
+    """Recompute every summary table from the full athletes_results table"""
+    return f"TRUNCATE {', '.join(SUMMARY_TABLES)};\n{accumulate_sql('athletes_results')}"
+
+def average_seconds_sql(columns: List[str]) -> str:
+    """Average duration per column, read from the per-year summary"""
+    averages = ", ".join(
+        f"SUM({column}_seconds) / NULLIF(SUM({column}_count), 0) AS {column}" for column in columns
+    )
+    return f"SELECT {averages} FROM {YEAR_SUMMARY_TABLE}"
@@ -1,19 +1,58 @@
+import numpy as np
+import pandas as pd
+
+def durations_to_seconds(durations):
+    """
+    Convert durations to float seconds in one vectorized call
+
+    Accepts a pandas Series, NumPy array or list of "H:M:S" strings (hours may
+    exceed 24), timedeltas or numbers already in seconds. Missing or unparseable
+    values become NaN. A Series keeps its index; anything else returns an array.
+    """
+    is_series = isinstance(durations, pd.Series)
+    values = durations if is_series else pd.Series(durations)
+
+    if pd.api.types.is_timedelta64_dtype(values):
+        seconds = values.dt.total_seconds()
+    elif pd.api.types.is_numeric_dtype(values):
+        seconds = values.astype("float64")
+    else:
+        # "H:M:S" strings, split column-wise
+        parts = values.astype("string").str.split(":", expand=True)
+        seconds = pd.Series(np.nan, index=values.index)
+        if parts.shape[1] >= 3:
+            hours, minutes, secs = (pd.to_numeric(parts[idx], errors="coerce") for idx in range(3))
+            seconds = hours * 3600 + minutes * 60 + secs
+            if parts.shape[1] > 3:
+                seconds[parts.iloc[:, 3:].notna().any(axis=1)] = np.nan
+
+        # Numbers and numeric strings ("3600") are seconds, not pd.to_timedelta's nanoseconds
+        unparsed = seconds.isna() & values.notna()
+        if unparsed.any():
+            seconds[unparsed] = pd.to_numeric(values[unparsed], errors="coerce")
+
+        # Timedelta objects and other pandas-readable durations ("1 days 02:00:00")
+        unparsed = seconds.isna() & values.notna()
+        if unparsed.any():
+            seconds[unparsed] = pd.to_timedelta(values[unparsed], errors="coerce").dt.total_seconds()
+        seconds = seconds.astype("float64")
+
+    return seconds if is_series else seconds.to_numpy()
+
+def durations_to_minutes(durations):
+    """Convert durations to float minutes, see durations_to_seconds"""
+    return durations_to_seconds(durations) / 60
+
+def durations_to_hours(durations):
+    """Convert durations to float hours, see durations_to_seconds"""
+    return durations_to_seconds(durations) / 3600
+
 def time_to_minutes(time_str):
     """Convert time string to minutes"""
-    if pd.isna(time_str):
-        return None
-    try:
-        h, m, s = map(float, time_str.split(':'))
-        return h * 60 + m + s / 60
-    except:
-        return None
-        
+    minutes = durations_to_minutes([time_str])[0]
+    return None if np.isnan(minutes) else minutes
+
 def time_to_hours(time_str):
     """Convert time string to hours"""
-    if pd.isna(time_str):
-        return None
-    try:
-        h, m, s = map(float, time_str.split(':'))
-        return h + m / 60 + s / 3600
-    except:
-        return None
\ No newline at end of file
+    hours = durations_to_hours([time_str])[0]
+    return None if np.isnan(hours) else hours
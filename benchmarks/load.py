@@ -0,0 +1,189 @@
+"""
+Load test the items API and report latency percentiles, throughput and errors
+
+Drives a mix of /items/ list, get and create requests from concurrent clients,
+either in-process (ASGI, no network) or against uvicorn. With --config, a uvicorn
+server is started per configuration (environment overrides plus worker count) and
+the results are printed side by side.
+
+Usage:
+    python -m benchmarks.load --concurrency 20 --duration 10
+    python -m benchmarks.load --url http://localhost:8000 --mix list=60,get=30,create=10
+    python -m benchmarks.load --config sync:DB_ASYNC=false --config async:DB_ASYNC=true \\
+        --config async-4w:DB_ASYNC=true,workers=4 --config pool-20:DB_POOL_SIZE=20
+
+Creates items in the database configured by the DB_* environment variables.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+DEFAULT_MIX = "list=70,get=20,create=10"
+
+async def list_items(client: httpx.AsyncClient, item_ids: List[int], rng: random.Random) -> httpx.Response:
+    return await client.get("/items/", params={"limit": 100})
+
+async def get_item(client: httpx.AsyncClient, item_ids: List[int], rng: random.Random) -> httpx.Response:
+    return await client.get(f"/items/{rng.choice(item_ids) if item_ids else 1}")
+
+async def create_item(client: httpx.AsyncClient, item_ids: List[int], rng: random.Random) -> httpx.Response:
+    response = await client.post("/items/", json={"title": f"load {rng.random():.6f}", "description": "load test"})
+    if response.status_code == 200:
+        item_ids.append(response.json()["id"])
+    return response
+
+OPERATIONS = {
+    "list": list_items,
+    "get": get_item,
+    "create": create_item,
+}
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    """Parse ``list=70,get=20,create=10`` into operation weights"""
+    weights = {}
+    for part in mix.split(","):
+        name, weight = part.split("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name!r}, expected one of {list(OPERATIONS)}")
+        weights[name] = int(weight)
+    return weights
+
+def parse_config(config: str) -> Tuple[str, Dict[str, str], int]:
+    """Parse ``name:KEY=VALUE,workers=N`` into a name, environment overrides and a worker count"""
+    name, _, assignments = config.partition(":")
+    env = dict(assignment.split("=", 1) for assignment in assignments.split(",") if assignment)
+    return name, env, int(env.pop("workers", 1))
+
+def percentile(latencies: List[float], q: int) -> float:
+    if len(latencies) < 2:
+        return latencies[0] if latencies else float("nan")
+    return statistics.quantiles(latencies, n=100, method="inclusive")[q - 1]
+
+def summarize(samples: List[Tuple[str, float, bool]], elapsed: float) -> Dict[str, Dict[str, float]]:
+    """Per operation (and "all"): requests, errors, error rate, RPS and p50/p95/p99 in milliseconds"""
+    groups: Dict[str, List[Tuple[float, bool]]] = {"all": []}
+    for operation, latency, ok in samples:
+        groups.setdefault(operation, []).append((latency, ok))
+        groups["all"].append((latency, ok))
+
+    summary = {}
+    for operation, group in groups.items():
+        latencies = [latency * 1000 for latency, _ in group]
+        errors = sum(1 for _, ok in group if not ok)
+        summary[operation] = {
+            "requests": len(group),
+            "errors": errors,
+            "error_rate": errors / len(group) if group else 0.0,
+            "rps": len(group) / elapsed if elapsed else 0.0,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+        }
+    return summary
+
+async def run_load(client: httpx.AsyncClient,
+                   concurrency: int,
+                   duration: float,
+                   mix: Dict[str, int],
+                   seed: int = 515) -> Dict[str, Dict[str, float]]:
+    """Run ``concurrency`` clients issuing the request mix for ``duration`` seconds"""
+    response = await client.get("/items/", params={"limit": 1000})
+    item_ids = [item["id"] for item in response.json()] if response.status_code == 200 else []
+    names, weights = list(mix), list(mix.values())
+    samples: List[Tuple[str, float, bool]] = []
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id: int) -> None:
+        rng = random.Random(seed + worker_id)
+        while time.perf_counter() < deadline:
+            operation = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await OPERATIONS[operation](client, item_ids, rng)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            samples.append((operation, time.perf_counter() - started, ok))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(worker_id) for worker_id in range(concurrency)))
+    return summarize(samples, time.perf_counter() - started)
+
+def in_process_client() -> httpx.AsyncClient:
+    """Client calling the app directly through ASGI, configured by the current environment"""
+    from backend.main import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test", timeout=60)
+
+async def run_against(client: httpx.AsyncClient, args) -> Dict[str, Dict[str, float]]:
+    async with client:
+        return await run_load(client, args.concurrency, args.duration, parse_mix(args.mix), args.seed)
+
+def start_server(env: Dict[str, str], workers: int, port: int) -> subprocess.Popen:
+    """Start uvicorn with the given environment overrides and wait until it answers"""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env={**os.environ, **env},
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start within 60 seconds")
+
+def print_report(results: Dict[str, Dict[str, Dict[str, float]]]) -> None:
+    """Print one row per configuration and operation"""
+    print(f"{'config':<16} {'operation':<8} {'requests':>9} {'rps':>9} {'p50 ms':>9} "
+          f"{'p95 ms':>9} {'p99 ms':>9} {'errors':>7} {'error %':>8}")
+    for config, summary in results.items():
+        for operation, row in summary.items():
+            print(f"{config:<16} {operation:<8} {row['requests']:>9} {row['rps']:>9.1f} {row['p50']:>9.1f} "
+                  f"{row['p95']:>9.1f} {row['p99']:>9.1f} {row['errors']:>7} {row['error_rate']:>8.2%}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="load test a running server instead of the app in-process")
+    parser.add_argument("--config", action="append",
+                        help="start uvicorn with NAME:ENV=VALUE,...,workers=N and load test it (repeatable)")
+    parser.add_argument("--port", type=int, default=8765, help="port for servers started with --config")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per run")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation weights, e.g. " + DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=515)
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Any] = {}
+    if args.config:
+        for config in args.config:
+            name, env, workers = parse_config(config)
+            server = start_server(env, workers, args.port)
+            try:
+                client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60)
+                results[name] = asyncio.run(run_against(client, args))
+            finally:
+                server.terminate()
+                server.wait()
+    elif args.url:
+        results[args.url] = asyncio.run(run_against(httpx.AsyncClient(base_url=args.url, timeout=60), args))
+    else:
+        results["in-process"] = asyncio.run(run_against(in_process_client(), args))
+
+    print_report(results)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
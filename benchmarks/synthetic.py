@@ -0,0 +1,164 @@
+"""
+Synthetic race history for benchmarks
+
+Fills athletes_athlete, athletes_race and athletes_results at a configurable scale
+with server-side generate_series inserts, so millions of results are created without
+shipping rows from Python. The same seed always produces the same data.
+
+Benchmarks only run against the database in BENCHMARK_DATABASE_URL, which must not
+be the application database (DATABASE_URL): reset_tables drops every results table.
+"""
+import os
+
+from sqlalchemy.engine import make_url
+
+from backend.database import DATABASE_URL
+from backend.utils.results_controller import DatabaseController
+
+BENCHMARK_TABLES = ["athletes_results", "athletes_race", "athletes_athlete"]
+SUMMARY_TABLES = ["results_edition_summary", "results_year_summary", "results_athlete_summary"]
+
+# Columns of the Django models that the backend reads
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS athletes_athlete (
+    id SERIAL PRIMARY KEY,
+    complete_name VARCHAR(100) NOT NULL UNIQUE,
+    first_name VARCHAR(30) NOT NULL,
+    nickname VARCHAR(30),
+    gender VARCHAR(10) NOT NULL,
+    eternal_number VARCHAR(30) NOT NULL UNIQUE,
+    city VARCHAR(100) NOT NULL,
+    state VARCHAR(100) NOT NULL,
+    country VARCHAR(100) NOT NULL,
+    date_of_birth DATE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS athletes_race (
+    id SERIAL PRIMARY KEY,
+    race_edition VARCHAR(30) NOT NULL,
+    race_date DATE NOT NULL,
+    race_location VARCHAR(100) NOT NULL
+);
+CREATE TABLE IF NOT EXISTS athletes_results (
+    id SERIAL PRIMARY KEY,
+    athlete_id INTEGER NOT NULL REFERENCES athletes_athlete(id) ON DELETE CASCADE,
+    race_id INTEGER NOT NULL REFERENCES athletes_race(id) ON DELETE CASCADE,
+    race_swim_10km_time INTERVAL NOT NULL,
+    race_swim_10km_rank INTEGER NOT NULL,
+    race_bike_145km_time INTERVAL NOT NULL,
+    race_bike_145km_rank INTEGER NOT NULL,
+    race_bike_276km_time INTERVAL NOT NULL,
+    race_bike_276km_rank INTEGER NOT NULL,
+    race_run_84km_time INTERVAL NOT NULL,
+    race_run_84km_rank INTEGER NOT NULL,
+    race_overall_time INTERVAL NOT NULL,
+    race_overall_rank INTEGER NOT NULL,
+    UNIQUE (athlete_id, race_id)
+);
+CREATE INDEX IF NOT EXISTS athletes_results_race_id ON athletes_results (race_id);
+CREATE INDEX IF NOT EXISTS athletes_results_athlete_id ON athletes_results (athlete_id);
+"""
+
+ATHLETES_SQL = """
+SELECT setseed(:seed);
+INSERT INTO athletes_athlete
+    (complete_name, first_name, gender, eternal_number, city, state, country, date_of_birth)
+SELECT
+    'Athlete ' || g,
+    (ARRAY['Ana', 'Bruno', 'Carla', 'Diego', 'Elisa', 'Felipe', 'Gabriela', 'Hugo'])[1 + g % 8],
+    CASE WHEN random() < 0.25 THEN 'F' ELSE 'M' END,
+    g::text,
+    (ARRAY['Sao Paulo', 'Rio de Janeiro', 'Paraty', 'Curitiba', 'Florianopolis', 'Belo Horizonte'])[1 + floor(random() * 6)::int],
+    (ARRAY['SP', 'RJ', 'PR', 'SC', 'MG'])[1 + floor(random() * 5)::int],
+    CASE WHEN random() < 0.8 THEN 'Brasil' ELSE 'USA' END,
+    date '1950-01-01' + floor(random() * 18000)::int
+FROM generate_series(1, :athletes) g
+"""
+
+# Editions spread over 35 years, however many there are
+RACES_SQL = """
+INSERT INTO athletes_race (race_edition, race_date, race_location)
+SELECT 'UB515 #' || g, date '1990-04-14' + (g * 12775 / :editions), 'Paraty'
+FROM generate_series(1, :editions) g
+"""
+
+# Each edition takes a block of consecutive athletes from a random start, so
+# (athlete_id, race_id) stays unique; the overall time is the sum of the segments
+RESULTS_SQL = """
+SELECT setseed(:seed);
+INSERT INTO athletes_results (
+    athlete_id, race_id,
+    race_swim_10km_time, race_swim_10km_rank,
+    race_bike_145km_time, race_bike_145km_rank,
+    race_bike_276km_time, race_bike_276km_rank,
+    race_run_84km_time, race_run_84km_rank,
+    race_overall_time, race_overall_rank
+)
+SELECT athlete_id, race_id, swim, 1, bike_145, 1, bike_276, 1, run, 1, swim + bike_145 + bike_276 + run, 1
+FROM (
+    SELECT
+        (SELECT MIN(id) FROM athletes_athlete) + (races.start + k) % :athletes AS athlete_id,
+        races.id AS race_id,
+        make_interval(secs => round(9000 + random() * 9000)) AS swim,
+        make_interval(secs => round(14400 + random() * 14400)) AS bike_145,
+        make_interval(secs => round(28800 + random() * 18000)) AS bike_276,
+        make_interval(secs => round(25200 + random() * 18000)) AS run
+    FROM (SELECT id, floor(random() * :athletes)::int AS start FROM athletes_race) races
+    CROSS JOIN generate_series(0, :results_per_edition - 1) k
+) generated
+"""
+
+def _database_identity(url: str):
+    """Server and database a url points to, ignoring driver and credentials"""
+    parsed = make_url(url)
+    return (parsed.host or "localhost").lower(), parsed.port or 5432, parsed.database
+
+def benchmark_controller() -> DatabaseController:
+    """
+    Controller bound to BENCHMARK_DATABASE_URL
+
+    Raises:
+        RuntimeError: If BENCHMARK_DATABASE_URL is not set or points to the application database
+    """
+    url = os.getenv("BENCHMARK_DATABASE_URL")
+    if not url:
+        raise RuntimeError("Set BENCHMARK_DATABASE_URL to a dedicated database; benchmarks drop and fill its tables")
+    if _database_identity(url) == _database_identity(DATABASE_URL):
+        raise RuntimeError("BENCHMARK_DATABASE_URL points to the application database (DATABASE_URL); use a dedicated one")
+    return DatabaseController(url)
+
+def reset_tables(controller: DatabaseController) -> None:
+    """Drop and recreate the results tables; this deletes every result, race and athlete"""
+    controller.execute_statement(f"DROP TABLE IF EXISTS {', '.join(BENCHMARK_TABLES + SUMMARY_TABLES)} CASCADE")
+    controller.execute_statement(SCHEMA_SQL)
+    controller.refresh_schema()
+
+def generate_race_history(editions: int,
+                          athletes: int,
+                          results_per_edition: int,
+                          controller: DatabaseController,
+                          seed: float = 0.515) -> int:
+    """
+    Fill the (empty) results tables with a reproducible synthetic race history
+
+    Args:
+        editions (int): Number of race editions
+        athletes (int): Number of athletes
+        results_per_edition (int): Finishers per edition (capped at ``athletes``)
+        controller (DatabaseController): Controller of the benchmark database, see benchmark_controller
+        seed (float): Seed for Postgres' random(), between -1 and 1
+
+    Returns:
+        int: Number of results generated
+    """
+    results_per_edition = min(results_per_edition, athletes)
+    controller.execute_statement(ATHLETES_SQL, {"seed": seed, "athletes": athletes})
+    controller.execute_statement(RACES_SQL, {"editions": editions})
+    count = controller.execute_statement(
+        RESULTS_SQL,
+        {"seed": seed, "athletes": athletes, "results_per_edition": results_per_edition},
+    )
+    controller.compute_ranks()
+    controller.execute_statement(f"ANALYZE {', '.join(BENCHMARK_TABLES)}")
+    if controller.use_summary_tables:
+        controller.create_summary_tables()
+    return count
@@ -7,7 +7,14 @@ from views.race_results import race_results_page
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
-from backend.utils.results_controller import db_controller
+from backend.database import get_pool_metrics
+from backend.utils.results_controller import db_controller, format_interval_rows
+from backend.utils.query_stats import query_stats
+
+# Rows loaded per explorer table; tables that fit are filtered locally
+EXPLORER_LIMIT = 500
+# Rows per page of the paginated grid used for larger tables
+EXPLORER_PAGE_SIZE = 100
 
 # Configure the app
 st.set_page_config(
@@ -34,10 +41,44 @@ def main():
     else:
         st.warning("Please select a page")
 
+    # After the page, so the stats include the queries of this run
+    show_query_stats()
+
+def show_query_stats():
+    """Sidebar panel with this process' query timings and connection pool counters"""
+    with st.sidebar.expander("Query stats"):
+        stats = query_stats.snapshot()
+        if stats["queries"]:
+            st.dataframe(
+                [
+                    {
+                        "query": q["fingerprint"][:80],
+                        "calls": q["calls"],
+                        "rows": q["rows"],
+                        "total ms": round(q["total_seconds"] * 1000, 1),
+                        "execute ms": round(q["execute_seconds"] * 1000, 1),
+                        "fetch ms": round(q["fetch_seconds"] * 1000, 1),
+                        "format ms": round(q["format_seconds"] * 1000, 1),
+                        "errors": q["errors"],
+                    }
+                    for q in stats["queries"]
+                ],
+                hide_index=True,
+            )
+        st.caption(f"{len(stats['slow_queries'])} recent queries over {stats['slow_query_ms']:.0f} ms")
+        # DatabaseController always uses the sync engine
+        st.json(get_pool_metrics(async_engine=False), expanded=False)
+        if st.button("Reset query stats"):
+            query_stats.reset()
+
 def database_explorer_page():
     st.header("Database Explorer")
 
     try:
+        # The schema is cached in-process; reload it after migrations
+        if st.button("Refresh schema"):
+            db_controller.refresh_schema()
+
         # Get all tables in the database
         tables = db_controller.get_all_tables()
         
@@ -59,49 +100,113 @@ def database_explorer_page():
         st.error(f"Error accessing database: {str(e)}")
         st.error("Please check your database connection and permissions")
 
+@st.cache_data(ttl=60)
+def load_table_slice(table_name: str):
+    """Load the first EXPLORER_LIMIT rows of a table, and whether that is the whole table"""
+    rows = db_controller.get_all_results(table_name, limit=EXPLORER_LIMIT + 1)
+    return rows[:EXPLORER_LIMIT], len(rows) <= EXPLORER_LIMIT
+
+@st.cache_data(ttl=300)
+def load_distinct_values(table_name: str, column: str):
+    """Load the distinct values of a column, cached per table and column"""
+    return db_controller.get_distinct_values(table_name, column)
+
+def filter_options(table_name: str, column: str, rows, complete: bool):
+    """Dropdown values for a column: from the loaded rows when they are the whole table, else from SQL"""
+    if complete:
+        values = {r[column] for r in rows if r.get(column) is not None}
+        return sorted(values, key=str)
+    return load_distinct_values(table_name, column)
+
+def filter_rows(table_name: str, filters, rows, complete: bool):
+    """Apply equality filters locally when the loaded rows are the whole table, else in SQL"""
+    if not filters:
+        return rows
+    if complete:
+        return [r for r in rows if all(r.get(key) == value for key, value in filters.items())]
+    return db_controller.get_results_by_filter(table_name, filters, limit=EXPLORER_LIMIT)
+
+@st.cache_data(ttl=60)
+def load_row_count(table_name: str, filter_items):
+    """Count the rows matching the filters, cached per table and filters"""
+    return db_controller.count_rows(table_name, dict(filter_items))
+
+def display_paginated_table(table_name: str, filters):
+    """
+    Page through a large table in SQL, sending only the visible page to the browser
+
+    Sorting and filtering run in the database with keyset paging; the cursors of
+    the pages visited are kept in the session so Previous/Next are index seeks.
+    """
+    col1, col2 = st.columns(2)
+    sort_column = col1.selectbox("Sort by", db_controller.get_sortable_columns(table_name), key=f"{table_name}_sort")
+    descending = col2.toggle("Descending", key=f"{table_name}_descending")
+
+    # One cursor stack per table, filters and sort order; a new combination starts at page 1
+    view = repr((table_name, sorted(filters.items()), sort_column, descending))
+    cursors = st.session_state.setdefault("explorer_cursors", {}).setdefault(view, [None])
+
+    page = db_controller.get_results_window(
+        table_name, filters, sort_column, descending, cursors[-1], EXPLORER_PAGE_SIZE
+    )
+    total = load_row_count(table_name, tuple(sorted(filters.items())))
+    pages = max(1, -(-total // EXPLORER_PAGE_SIZE))
+
+    st.caption(f"Page {len(cursors)} of {pages} · {total} records")
+    # Rows keep exact timedeltas for the cursors; only the displayed copy is formatted
+    st.dataframe(format_interval_rows(page))
+
+    col1, col2 = st.columns(2)
+    col1.button("Previous", key=f"{table_name}_previous", disabled=len(cursors) == 1, on_click=cursors.pop)
+    next_cursor = db_controller.window_cursor(table_name, page[-1], sort_column) if page else None
+    col2.button(
+        "Next",
+        key=f"{table_name}_next",
+        disabled=len(page) < EXPLORER_PAGE_SIZE or len(cursors) >= pages,
+        on_click=cursors.append,
+        args=(next_cursor,),
+    )
+
 def display_athletes_results():
     """Special handling for athletes_results table"""
     st.subheader("Athletes Results")
     
     try:
         # Get initial data
-        results = db_controller.get_all_results("athletes_results")
+        results, complete = load_table_slice("athletes_results")
         
         if not results:
             st.info("No athlete results found")
             return
         
         # Create filter options
-        col1, col2, col3 = st.columns(3)
+        col1, col2 = st.columns(2)
         
         with col1:
             # Get unique athlete IDs
-            athlete_ids = ["All"] + sorted(list(set(str(r['athlete_id']) for r in results if 'athlete_id' in r)))
+            athlete_ids = ["All"] + filter_options("athletes_results", "athlete_id", results, complete)
             selected_athlete = st.selectbox("Select Athlete ID", athlete_ids)
         
         with col2:
-            # Get unique years
-            years = ["All"] + sorted(list(set(str(r['year']) for r in results if 'year' in r)))
-            selected_year = st.selectbox("Select Year", years)
-        
-        with col3:
-            # Get unique events if available
-            events = ["All"]
-            if 'event' in results[0]:
-                events += sorted(list(set(str(r['event']) for r in results if r['event'])))
-            selected_event = st.selectbox("Select Event", events)
+            # Get unique races
+            race_ids = ["All"] + filter_options("athletes_results", "race_id", results, complete)
+            selected_race = st.selectbox("Select Race ID", race_ids)
         
         # Apply filters
         filters = {}
         if selected_athlete != "All":
-            filters["athlete_id"] = int(selected_athlete)
-        if selected_year != "All":
-            filters["year"] = int(selected_year)
-        if selected_event != "All" and 'event' in results[0]:
-            filters["event"] = selected_event
+            filters["athlete_id"] = selected_athlete
+        if selected_race != "All":
+            filters["race_id"] = selected_race
         
+        # Large table: page through it in SQL
+        if not complete:
+            st.subheader("Results")
+            display_paginated_table("athletes_results", filters)
+            return
+
         # Get filtered results
-        filtered_results = db_controller.get_results_by_filter("athletes_results", filters) if filters else results
+        filtered_results = filter_rows("athletes_results", filters, results, complete)
         
         if filtered_results:
             st.subheader("Results")
@@ -132,11 +237,23 @@ def display_athletes_results():
 
 def display_generic_table(table_name: str):
     """Display any other table in a generic way"""
-    results = db_controller.get_all_results(table_name)
+    results, complete = load_table_slice(table_name)
     
-    if results:
+    if results and not complete and db_controller.get_primary_key(table_name) is not None:
+        # Large table: filter, sort and page through it in SQL
+        st.subheader(f"Data from {table_name}")
+        col1, col2 = st.columns(2)
+        selected_column = col1.selectbox("Select column to filter", list(results[0].keys()))
+        filter_value = col2.selectbox(
+            f"Select {selected_column}",
+            ["All"] + filter_options(table_name, selected_column, results, complete),
+            format_func=str,
+        )
+        display_paginated_table(table_name, {} if filter_value == "All" else {selected_column: filter_value})
+
+    elif results:
         st.subheader(f"Data from {table_name}")
-        st.info(f"Found {len(results)} records")
+        st.info(f"Found {len(results)} records" if complete else f"Showing the first {len(results)} records")
         st.dataframe(results)
         
         # Get column names from the first result
@@ -148,14 +265,11 @@ def display_generic_table(table_name: str):
             selected_column = st.selectbox("Select column to filter", columns)
             
             if selected_column:
-                unique_values = list(set(str(r[selected_column]) for r in results))
-                filter_value = st.selectbox(f"Select {selected_column}", unique_values)
+                unique_values = filter_options(table_name, selected_column, results, complete)
+                filter_value = st.selectbox(f"Select {selected_column}", unique_values, format_func=str)
                 
-                if filter_value:
-                    filtered_results = db_controller.get_results_by_filter(
-                        table_name,
-                        {selected_column: filter_value}
-                    )
+                if filter_value is not None:
+                    filtered_results = filter_rows(table_name, {selected_column: filter_value}, results, complete)
                     st.subheader(f"Filtered Results for {selected_column} = {filter_value}")
                     st.dataframe(filtered_results)
     else:
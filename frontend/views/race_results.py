@@ -2,59 +2,49 @@ import streamlit as st
 import pandas as pd
 import os
 import sys
-from datetime import datetime
 import plotly.express as px
 import altair as alt
-# from backend.utils.time_conversor import time_to_minutes, time_to_hours
-import time
 
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, project_root)
 
 from backend.utils.results_controller import db_controller
-from backend.helpers.results_controler import display_columns
-
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def load_data():
-    """Load and merge all data with caching"""
-    results = pd.DataFrame(db_controller.get_all_results("athletes_results"))
-    races = pd.DataFrame(db_controller.get_all_results("athletes_race"))
-    athletes = pd.DataFrame(db_controller.get_all_results("athletes_athlete"))
-    
-    # Merge data
-    df_results_races = pd.merge(
-        results,
-        races,
-        left_on='race_id',
-        right_on='id',
-        how='left',
-        suffixes=('', '_race')
-    )
-    
-    df_results_athletes = pd.merge(
-        df_results_races,
-        athletes,
-        left_on='athlete_id',
-        right_on='id',
-        how='left',
-        suffixes=('', '_athlete')
-    )
-    
-    return df_results_athletes[display_columns]
-
-def plot_participants_by_year(df):
-    """Plot total participants by year, handling data types explicitly and ensuring correct plotting."""
-    
-    # Convert the 'race_date' to year and ensure it's an integer
-    df['year'] = pd.to_datetime(df['race_date']).dt.year
-    df['year'] = df['year'].astype(int)
-
-    # Replace year "2,016" to "2016"
-    df['year'] = df['year'].replace(",", "")
-
-    # Group participants by year and count entries
-    participants_by_year = df.groupby('year').agg({'id': 'count'}).reset_index()
-    participants_by_year.columns = ['Ano', 'Participantes']  # Rename for clarity
+from backend.utils.results_cache import cached
+from backend.utils.time_conversor import durations_to_hours
+
+# Race segments shown in the average times chart, mapped to their result column
+SEGMENTS = {
+    'Dia 1': 'race_swim_10km_time',
+    'Dia 2': 'race_bike_276km_time',
+    'Dia 3': 'race_run_84km_time',
+    'Total': 'race_overall_time'
+}
+
+# Shared by every session and process, until the results tables change
+@cached("participants_by_year")
+def load_participants_by_year():
+    """Load finishers per race year, aggregated in the database"""
+    return db_controller.get_participants_by_year()
+
+@cached("average_segment_times")
+def load_average_segment_times():
+    """Load average segment durations (in seconds), aggregated in the database"""
+    return db_controller.get_average_segment_times(list(SEGMENTS.values()))
+
+@cached("top_athletes")
+def load_top_athletes(limit=10):
+    """Load the athletes with most participations, aggregated in the database"""
+    return db_controller.get_top_athletes(limit)
+
+# Ages also change with the date, so entries expire daily
+@cached("age_distribution", max_age=24 * 3600)
+def load_age_distribution(min_age=20):
+    """Load finishers per age, aggregated in the database"""
+    return db_controller.get_age_distribution(min_age)
+
+def plot_participants_by_year(participants_by_year):
+    """Plot total participants by year from the per-year counts"""
+    participants_by_year = participants_by_year.rename(columns={'year': 'Ano', 'participants': 'Participantes'})
 
     # Ensure 2020 is removed if it has no data
     participants_by_year = participants_by_year[participants_by_year['Ano'] != 2020]
@@ -65,38 +55,26 @@ def plot_participants_by_year(df):
     return participants_by_year
 
 
-def plot_average_times(df):
-    """Plot average times for each segment"""
-    segments = {
-        'Dia 1': 'race_swim_10km_time',
-        'Dia 2': 'race_bike_276km_time',
-        'Dia 3': 'race_run_84km_time',
-        'Total': 'race_overall_time'
-    }
+def plot_average_times(segment_times):
+    """Plot average times for each segment from the per-segment averages (in seconds)"""
+    average_seconds = segment_times.set_index('segment')['average_seconds']
+    average_hours = durations_to_hours(average_seconds)
 
     avg_times = []
-    for segment, column in segments.items():
-        # Convert time strings to hours and handle missing values
-        times = []
-        for time_str in df[column].dropna():
-            try:
-                h, m, s = map(float, time_str.split(':'))
-                hours = h + m/60 + s/3600
-                times.append(hours)
-            except:
-                continue
-        
-        if times:
-            avg_time = sum(times) / len(times)
-            # Convert to hours and minutes for display
-            hours = int(avg_time)
-            minutes = int((avg_time - hours) * 60)
-            time_str = f"{hours}h {minutes}m"
-            avg_times.append({
-                'categoria': segment,
-                'tempo médio': round(avg_time, 2),
-                'tempo_formatado': time_str
-            })
+    for segment, column in SEGMENTS.items():
+        if pd.isna(average_seconds.get(column)):
+            continue
+
+        avg_time = average_hours[column]
+        # Convert to hours and minutes for display
+        hours = int(avg_time)
+        minutes = int((avg_time - hours) * 60)
+        time_str = f"{hours}h {minutes}m"
+        avg_times.append({
+            'categoria': segment,
+            'tempo médio': round(avg_time, 2),
+            'tempo_formatado': time_str
+        })
 
     df_avg_times = pd.DataFrame(avg_times)
     
@@ -134,52 +112,34 @@ def plot_average_times(df):
     
     st.altair_chart(final_chart, use_container_width=True)
     
-    # Calculate overall average time for the message
-    total_times = []
-    for time_str in df['race_overall_time'].dropna():
-        try:
-            h, m, s = map(float, time_str.split(':'))
-            total_times.append(f"{int(h)}:{int(m)}:{int(s)}")
-        except:
-            continue
-    
-    return df_avg_times, total_times[0] if total_times else "N/A"
-
-def plot_top_athletes(df_results_athletes):
-    """Plot top 10 athletes by participation"""
-    # Get participation counts
-    athlete_participations = df_results_athletes.groupby(
-        ['athlete_id', 'first_name', 'eternal_number']
-    ).agg({'id': 'count'}).reset_index()
-    
-    # Get top 10 and sort
-    top_10_athletes = athlete_participations.nlargest(10, 'id').sort_values('id', ascending=False).reset_index(drop=True)
-    
-    # Rename columns
-    top_10_athletes.columns = ['Atleta', 'Nome', 'Número Eterno', 'Participações']
-    # Drop column "Atleta"
-    top_10_athletes = top_10_athletes.drop(columns=['Atleta'])
+    # Format the overall average time for the message
+    seconds = average_seconds.get('race_overall_time')
+    if pd.isna(seconds):
+        return df_avg_times, "N/A"
+
+    return df_avg_times, f"{int(seconds // 3600)}:{int(seconds % 3600 // 60)}:{int(seconds % 60)}"
+
+def plot_top_athletes(top_athletes):
+    """Plot top athletes by participation"""
+    # Select and rename into a new frame, leaving the cached one untouched
+    top_athletes = top_athletes[['first_name', 'eternal_number', 'participations']].set_axis(
+        ['Nome', 'Número Eterno', 'Participações'], axis=1
+    )
     
     # Show the dataframe
-    st.dataframe(top_10_athletes, hide_index=True)
+    st.dataframe(top_athletes, hide_index=True)
     
-    return top_10_athletes
+    return top_athletes
 
-def plot_age_distribution(df):
-    """Plot age distribution of participants"""
-    df['age'] = (datetime.now() - pd.to_datetime(df['date_of_birth'])).dt.days // 365
-    df = df.loc[df['age'] > 22]
-    
-    # Group by age and count participants
-    age_counts = df.groupby('age').size().reset_index(name='quantidade')
+def plot_age_distribution(age_counts):
+    """Plot age distribution of participants from the per-age counts"""
+    age_counts = age_counts.loc[age_counts['age'] > 22].rename(columns={'participants': 'quantidade'})
     
     # st.dataframe(age_counts)
     
     # Create scatter plot using Altair
-    import altair as alt
-    
     chart = alt.Chart(age_counts).mark_circle(size=60).encode(
-        x=alt.X('age:Q', scale=alt.Scale(domain=[22, max(df['age']) + 3])),
+        x=alt.X('age:Q', scale=alt.Scale(domain=[22, age_counts['age'].max() + 3])),
         y='quantidade:Q',
         tooltip=['age', 'quantidade']
     ).properties(
@@ -190,54 +150,62 @@ def plot_age_distribution(df):
     
     st.altair_chart(chart, use_container_width=True)
 
-    return df
+    return age_counts
+
+def show_participants_by_year():
+    participants_by_year = load_participants_by_year()
+    if participants_by_year.empty:
+        st.info("Nenhum dado encontrado... ⚠️")
+        return
+
+    st.write("Este evento é único, cujos principais valores são superação, simplicidade, solidariedade, companhia e lealdade, valores representados pelas palavras hawaianas ALOHA (AMOR), OHANA (FAMILIA) e KOKUA (SOLIDARIDADE).")
+    plot_participants_by_year(participants_by_year)
+    st.write("### Cruzaram a linha de chegada até agora: ", int(participants_by_year['participants'].sum()))
+
+def show_average_times():
+    avg_times, total_time = plot_average_times(load_average_segment_times())
+    st.write("### Tempo médio de conclusão da prova: ", "28h")
+
+def show_top_athletes():
+    st.write("Uma menção honrosa para os Ultra Atletas que participaram em várias edições do UB515 💌")
+    plot_top_athletes(load_top_athletes())
+
+def show_age_distribution():
+    age_counts = load_age_distribution(min_age=20)
+    if age_counts.empty:
+        st.info("Nenhum dado encontrado... ⚠️")
+        return
+
+    plot_age_distribution(age_counts)
+    # Removing decimal case from age
+    mean_age = (age_counts['age'] * age_counts['participants']).sum() / age_counts['participants'].sum()
+    st.write("### Idade média dos participantes: ", round(mean_age))
+
+# Dashboard views; only the selected one is queried and rendered on each run
+RACE_VIEWS = {
+    "Participantes por Ano": show_participants_by_year,
+    "Tempo Médio": show_average_times,
+    "Atletas em Destaque": show_top_athletes,
+    "Distribuição de Idade": show_age_distribution,
+}
 
 def race_results_page():
     st.title("UB515 - Ultraman Brasil")
     st.subheader("Curiosidades sobre a Prova")
     st.markdown("#### 🏊🚴🏃‍♂️💨")
 
+    # Horizontal selector instead of st.tabs, which would run every tab's queries up front
+    selected_view = st.radio(
+        "Visualização",
+        list(RACE_VIEWS),
+        horizontal=True,
+        label_visibility="collapsed"
+    )
+
     try:
-        # Load data with caching
         with st.spinner("Carregando os dados... ⌛"):
-            time.sleep(5)
-            df = load_data()
-            
-            if df.empty:
-                st.info("Nenhum dado encontrado... ⚠️")
-                return
-            
-            # st.markdown("#### Resultados")
-            # st.dataframe(df)
-
-            # Create tabs for visualizations
-            tab1, tab2, tab3, tab4 = st.tabs([
-                "Participantes por Ano",
-                "Tempo Médio",
-                "Atletas em Destaque",
-                "Distribuição de Idade"
-            ])
-
-            with tab1:
-                st.write("Este evento é único, cujos principais valores são superação, simplicidade, solidariedade, companhia e lealdade, valores representados pelas palavras hawaianas ALOHA (AMOR), OHANA (FAMILIA) e KOKUA (SOLIDARIDADE).")
-                plot_participants_by_year(df)
-                st.write("### Cruzaram a linha de chegada até agora: ", len(df))
-
-            with tab2:
-                avg_times, total_time = plot_average_times(df)
-                st.write("### Tempo médio de conclusão da prova: ", "28h")
-
-            with tab3:
-                st.write("Uma menção honrosa para os Ultra Atletas que participaram em várias edições do UB515 💌")
-                plot_top_athletes(df)
-
-            with tab4:
-                
-                plot_age_distribution(df)
-                df = df.loc[df['age'] > 20]
-                # Removing decimal case from age
-                st.write("### Idade média dos participantes: ", round(df['age'].mean()))
+            RACE_VIEWS[selected_view]()
 
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
-        st.error("Please check database connection and try again")
\ No newline at end of file
+        st.error("Please check database connection and try again")
@@ -0,0 +1,14 @@
+import os
+import sys
+
+# Importing the backend creates (but does not connect) the shared engine, which needs a parseable url
+for name, value in {
+    "DB_USER": "postgres",
+    "DB_PASSWORD": "postgres",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "postgres",
+}.items():
+    os.environ.setdefault(name, value)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
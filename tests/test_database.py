@@ -0,0 +1,36 @@
+import threading
+import time
+from unittest import mock
+
+from backend.database import PoolMetrics, TimedQueuePool
+
+def slow_connect():
+    time.sleep(0.2)
+    return mock.Mock()
+
+def pool(**options):
+    class Pool(TimedQueuePool):
+        metrics = PoolMetrics()
+    return Pool(slow_connect, **options)
+
+def test_connect_time_is_not_a_wait():
+    timed = pool(pool_size=1, max_overflow=0)
+
+    timed.connect().close()
+    stats = timed.metrics.snapshot()
+
+    assert stats["total_connect_seconds"] >= 0.2
+    assert stats["max_wait_seconds"] < 0.1
+
+def test_waiting_for_a_checked_in_connection_is_a_wait():
+    timed = pool(pool_size=1, max_overflow=0, timeout=5)
+    held = timed.connect()
+    release = threading.Timer(0.3, held.close)
+    release.start()
+
+    timed.connect().close()
+    release.join()
+    stats = timed.metrics.snapshot()
+
+    assert stats["max_wait_seconds"] >= 0.2
+    assert stats["total_connect_seconds"] < 0.3
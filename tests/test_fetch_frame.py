@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+import pandas as pd
+
+from backend.utils.results_controller import _column_to_array, _concat_column
+
+def frame_column(batches, interval_format="seconds"):
+    chunks = [_column_to_array(batch, interval_format) for batch in batches]
+    return _concat_column(chunks, [len(batch) for batch in batches])
+
+def test_batches_match_a_single_pass():
+    batches = [(1, 2), (None, 4), (5,)]
+
+    column = frame_column(batches)
+
+    assert column.dtype == "float64"
+    pd.testing.assert_series_equal(column, pd.Series([1, 2, None, 4, 5], dtype="float64"))
+
+def test_intervals_as_seconds_and_timedeltas():
+    batches = [(timedelta(hours=25), None), (timedelta(seconds=1.5),)]
+
+    seconds = frame_column(batches, "seconds")
+    durations = frame_column(batches, "timedelta")
+
+    assert seconds.tolist()[::2] == [90000.0, 1.5] and pd.isna(seconds[1])
+    assert durations.dtype == "timedelta64[ns]"
+    assert durations[0] == pd.Timedelta(hours=25) and durations[1] is pd.NaT
+
+def test_all_null_batches_take_the_column_type():
+    assert frame_column([(None, None), (1, 2)]).dtype == "float64"
+    assert frame_column([(None,), (timedelta(minutes=1),)], "timedelta").dtype == "timedelta64[ns]"
+    assert frame_column([("a",), (None, None)]).tolist() == ["a", None, None]
+    assert frame_column([(None,), (None,)]).tolist() == [None, None]
+
+def test_no_batches_is_an_empty_column():
+    assert frame_column([]).empty
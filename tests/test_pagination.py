@@ -0,0 +1,47 @@
+import base64
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, Response
+
+from backend.pagination import decode_cursor, encode_cursor, set_next_cursor
+
+def item(item_id, created_at=datetime(2024, 4, 14, 6, 30, 0, 123456)):
+    return SimpleNamespace(id=item_id, created_at=created_at)
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(item(42))
+
+    assert decode_cursor(cursor) == (datetime(2024, 4, 14, 6, 30, 0, 123456), 42)
+    assert cursor.isascii() and "/" not in cursor and "+" not in cursor
+
+def test_empty_cursor_is_first_page():
+    assert decode_cursor("") is None
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(b"1").decode(),
+    base64.urlsafe_b64encode(b'["2024-04-14T06:30:00", 1, 2]').decode(),
+    base64.urlsafe_b64encode(b'["yesterday", 1]').decode(),
+    base64.urlsafe_b64encode(b'[1, 1]').decode(),
+    base64.urlsafe_b64encode(b'["2024-04-14T06:30:00", "one"]').decode(),
+])
+def test_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+
+    assert error.value.status_code == 400
+
+def test_next_cursor_only_for_full_pages():
+    items = [item(1), item(2)]
+
+    full, partial, empty = Response(), Response(), Response()
+    set_next_cursor(full, items, 2)
+    set_next_cursor(partial, items, 3)
+    set_next_cursor(empty, [], 0)
+
+    assert decode_cursor(full.headers["X-Next-Cursor"])[1] == 2
+    assert "X-Next-Cursor" not in partial.headers
+    assert "X-Next-Cursor" not in empty.headers
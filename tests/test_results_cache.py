@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import stat
+
+import pandas as pd
+import pytest
+
+from backend.utils import results_cache
+
+@pytest.fixture
+def data_version(monkeypatch):
+    """Stand-in for the database's data version, so no database is needed"""
+    version = {"value": "v1"}
+    monkeypatch.setattr(results_cache, "get_data_version", lambda tables: version["value"])
+    return version
+
+@pytest.fixture
+def backend():
+    backend = results_cache.MemoryCacheBackend()
+    results_cache.set_cache_backend(backend)
+    yield backend
+    results_cache.set_cache_backend(None)
+
+class BrokenBackend:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise sqlite3.OperationalError("database is locked")
+        return fail
+
+def counting_loader(name, **options):
+    calls = []
+
+    @results_cache.cached(name, **options)
+    def load(value):
+        calls.append(value)
+        return pd.DataFrame({"value": [value]})
+
+    return load, calls
+
+def test_cached_until_data_version_changes(data_version, backend):
+    load, calls = counting_loader("versioned")
+
+    assert load(1)["value"].tolist() == [1]
+    assert load(1)["value"].tolist() == [1]
+    data_version["value"] = "v2"
+    load(1)
+
+    assert calls == [1, 1]
+    # The entry of the older version was replaced, not kept next to the new one
+    assert len(backend._values) == 1
+
+def test_arguments_are_cached_separately(data_version, backend):
+    load, calls = counting_loader("arguments")
+
+    load(1), load(2), load(1)
+
+    assert calls == [1, 2]
+
+def test_broken_backend_falls_back_to_loader(data_version):
+    results_cache.set_cache_backend(BrokenBackend())
+    try:
+        load, calls = counting_loader("broken")
+        assert load(1)["value"].tolist() == [1]
+        assert calls == [1]
+    finally:
+        results_cache.set_cache_backend(None)
+
+def test_failing_store_still_returns_value(data_version, backend, monkeypatch):
+    def fail(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(backend, "set", fail)
+    load, calls = counting_loader("unstored")
+
+    assert load(1)["value"].tolist() == [1]
+    assert not backend._leases
+
+def test_loader_errors_propagate_once(data_version, backend):
+    calls = []
+
+    @results_cache.cached("failing")
+    def load():
+        calls.append(1)
+        raise RuntimeError("query failed")
+
+    with pytest.raises(RuntimeError):
+        load()
+    assert calls == [1]
+    assert not backend._leases
+
+def test_sqlite_backend_round_trip_and_permissions(tmp_path, data_version):
+    path = str(tmp_path / "cache.sqlite3")
+    backend = results_cache.SQLiteCacheBackend(path)
+    frame = pd.DataFrame({"seconds": [1.5, None], "name": ["a", "b"]})
+
+    backend.set("loader:1:v1", frame, "loader:1")
+    backend.set("loader:1:v2", frame, "loader:1")
+
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert backend.get("loader:1:v1") is None
+    pd.testing.assert_frame_equal(backend.get("loader:1:v2")[1], frame)
+
+def test_default_cache_path_is_private(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    path = results_cache.default_cache_path()
+
+    assert stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode) == 0o700
+    os.chmod(os.path.dirname(path), 0o750)
+    with pytest.raises(PermissionError):
+        results_cache.default_cache_path()
+
+def test_unusable_cache_directory_falls_back_to_loader(tmp_path, monkeypatch, data_version):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.delenv("RESULTS_CACHE_PATH", raising=False)
+    os.makedirs(tmp_path / "ultraman", mode=0o755)
+    os.chmod(tmp_path / "ultraman", 0o755)
+    results_cache.set_cache_backend(None)
+    load, calls = counting_loader("unsafe")
+
+    assert load(1)["value"].tolist() == [1]
+    assert calls == [1]
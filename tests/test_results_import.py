@@ -0,0 +1,78 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from backend.utils.results_import import (
+    RESULT_SHEET_COLUMNS,
+    SEGMENT_TIME_COLUMNS,
+    prepare_results,
+    read_result_sheet,
+    validate_results,
+)
+
+def result_row(segment, overall, **values):
+    row = {column: 1 for column in RESULT_SHEET_COLUMNS}
+    row.update({column: segment for column in SEGMENT_TIME_COLUMNS}, race_overall_time=overall)
+    row.update(values)
+    return row
+
+def test_numeric_times_are_seconds():
+    results = prepare_results(pd.DataFrame([result_row(3600, 14400)]))
+
+    assert results["race_swim_10km_time"].tolist() == [pd.Timedelta(hours=1)]
+    assert results["race_overall_time"].tolist() == [pd.Timedelta(hours=4)]
+    assert validate_results(results).empty
+
+def test_mixed_time_formats():
+    sheet = pd.DataFrame([result_row("1:00:00", "4:00:00", race_bike_145km_time=datetime.time(1), race_run_84km_time="3600")])
+
+    assert validate_results(prepare_results(sheet)).empty
+
+def test_excel_day_fractions(tmp_path):
+    path = tmp_path / "results.xlsx"
+    pd.DataFrame([result_row(1 / 24, 4 / 24)]).to_excel(path, index=False)
+
+    results = prepare_results(read_result_sheet(str(path)))
+
+    assert results["race_overall_time"].tolist() == [pd.Timedelta(hours=4)]
+    assert validate_results(results).empty
+
+def test_inconsistent_overall_time():
+    violations = validate_results(prepare_results(pd.DataFrame([result_row(3600, 14000)])))
+
+    assert violations.to_dict("records") == [
+        {"row": 0, "field": "race_overall_time", "error": "Overall time is not equal to the sum of the individual times"}
+    ]
+
+def test_unparseable_time_is_null():
+    violations = validate_results(prepare_results(pd.DataFrame([result_row(3600, "soon")])))
+
+    assert violations[["field", "error"]].to_dict("records") == [
+        {"field": "race_overall_time", "error": "Time cannot be null"}
+    ]
+
+@pytest.mark.parametrize("column, error", [
+    ("athlete_id", "Reference must be an integer"),
+    ("race_id", "Reference must be an integer"),
+    ("race_overall_rank", "Rank must be an integer"),
+])
+def test_non_integer_ids_and_ranks(column, error):
+    sheet = pd.DataFrame([result_row(3600, 14400), result_row(3600, 14400, **{"athlete_id": 2, column: 2.5})])
+
+    violations = validate_results(prepare_results(sheet))
+
+    assert violations.to_dict("records") == [{"row": 1, "field": column, "error": error}]
+
+def test_duplicate_and_stored_results():
+    sheet = pd.DataFrame([result_row(3600, 14400), result_row(3600, 14400), result_row(3600, 14400, athlete_id=2)])
+    existing = pd.DataFrame({"athlete_id": [2], "race_id": [1]})
+
+    violations = validate_results(prepare_results(sheet), existing)
+
+    assert violations["row"].tolist() == [1, 2]
+    assert set(violations["error"]) == {"Athlete already has a result for this race"}
+
+def test_missing_columns():
+    with pytest.raises(ValueError, match="missing columns"):
+        prepare_results(pd.DataFrame([{"athlete_id": 1}]))
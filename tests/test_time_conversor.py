@@ -0,0 +1,39 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.utils.time_conversor import durations_to_hours, durations_to_seconds, time_to_minutes
+
+def test_hms_strings():
+    seconds = durations_to_seconds(["01:00:00", "27:30:15.5", "0:00:01"])
+
+    assert seconds.tolist() == [3600.0, 99015.5, 1.0]
+
+def test_numbers_and_numeric_strings_are_seconds():
+    assert durations_to_seconds(["3600", "90.5", 7200]).tolist() == [3600.0, 90.5, 7200.0]
+    assert durations_to_seconds(pd.Series([3600, 60])).tolist() == [3600.0, 60.0]
+
+def test_timedeltas():
+    values = [pd.Timedelta(minutes=2), datetime.timedelta(seconds=3), "1 days 02:00:00"]
+
+    assert durations_to_seconds(values).tolist() == [120.0, 3.0, 93600.0]
+    assert durations_to_seconds(pd.Series(pd.to_timedelta(["1h"]))).tolist() == [3600.0]
+
+def test_missing_and_unparseable_values_are_nan():
+    seconds = durations_to_seconds([None, "soon", "1:00:00:00", "1:00:00"])
+
+    assert np.isnan(seconds[:3]).all()
+    assert seconds[3] == 3600.0
+
+def test_series_keeps_its_index():
+    seconds = durations_to_seconds(pd.Series(["3600", "1:00:00"], index=[5, 6]))
+
+    assert seconds.index.tolist() == [5, 6]
+    assert seconds.tolist() == [3600.0, 3600.0]
+
+def test_unit_helpers():
+    assert durations_to_hours(["02:30:00"]).tolist() == [2.5]
+    assert time_to_minutes("01:30:00") == pytest.approx(90.0)
+    assert time_to_minutes("not a time") is None